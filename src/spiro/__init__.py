@@ -19,16 +19,24 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ['BezierContext', 'ControlPoints', 'CPType', 'SVGPathContext',
+__all__ = ['BezierContext', 'ControlPoints', 'CPType', 'IndexContext',
+           'PackedControlPoints', 'SegmentArray', 'SegmentIndex', 'SegType',
+           'SolvedSpiro', 'SpiroSamples', 'StrokeContext', 'SVGDocument',
+           'SVGPathContext', 'TransformContext', 'solve', 'tagged_solve',
            'to_bezier', 'tagged_to_bezier']
 
 # Standard library imports.
 from ctypes import POINTER
 
 # Local imports.
-from ._context import BezierContext, SVGPathContext
-from ._cp import ControlPoints, CPType
+from ._context import (BezierContext, SVGDocument, SVGPathContext,
+                       TransformContext)
+from ._cp import ControlPoints, CPType, PackedControlPoints
+from ._index import IndexContext, SegmentIndex
 from ._native import SpiroCPsToBezier, TaggedSpiroCPsToBezier
+from ._segments import SegmentArray, SegType
+from ._solved import SolvedSpiro, SpiroSamples
+from ._stroke import StrokeContext
 
 # Functions for using libspiro.
 def to_bezier(points, is_closed, context):
@@ -39,3 +47,11 @@ def to_bezier(points, is_closed, context):
 def tagged_to_bezier(points, context):
     """Convert a "tagged" sequence of Spiro points to Bézier curves."""
     TaggedSpiroCPsToBezier(points, context)
+
+def solve(points, is_closed):
+    """Solve a sequence of Spiro points without generating curves."""
+    return SolvedSpiro(points, is_closed)
+
+def tagged_solve(points):
+    """Solve a "tagged" sequence of Spiro points."""
+    return SolvedSpiro.from_tagged(points)
@@ -21,11 +21,16 @@
 # You should have received a copy of the GNU General Public License
 # along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ['BezierContext', 'SVGPathContext']
+__all__ = ['BezierContext', 'SVGDocument', 'SVGPathContext',
+           'TransformContext']
 
 # Standard library imports.
 from ctypes import (CFUNCTYPE, POINTER, pointer, Structure, c_double, c_int,
                     c_void_p)
+import gzip
+import io
+from numbers import Real
+from xml.sax.saxutils import quoteattr
 
 # Native interface definitions.
 class bezctx(Structure):
@@ -113,6 +118,55 @@ class BezierContext:
         return
 
 
+class TransformContext(BezierContext):
+    """Apply an affine transformation to Bézier curves.
+
+    This context wraps another context, passing each curve on to it
+    after transforming its coordinates. The transformation matrix is
+    given as six numbers (a, b, c, d, e, f), as in SVG, so that each
+    point (x, y) becomes (a*x + c*y + e, b*x + d*y + f):
+        >>> italic = (1, 0, 0.2, 1, 0, 0)
+        >>> with SVGPathContext(sys.stdout) as ctx:
+        ...     spiro.tagged_to_bezier(points, TransformContext(ctx, italic))
+
+    """
+    def __init__(self, context, matrix):
+        self.context = context
+        self.matrix = _checkmatrix(matrix)
+
+    def _apply(self, *coords):
+        a, b, c, d, e, f = self.matrix
+        xs, ys = coords[0::2], coords[1::2]
+        return [n for x, y in zip(xs, ys)
+                for n in (a * x + c * y + e, b * x + d * y + f)]
+
+    def moveto(self, ctx, x, y, is_open):
+        x, y = self._apply(x, y)
+        self.context.moveto(ctx, x, y, is_open)
+
+    def lineto(self, ctx, x, y):
+        self.context.lineto(ctx, *self._apply(x, y))
+
+    def quadto(self, ctx, x1, y1, x2, y2):
+        self.context.quadto(ctx, *self._apply(x1, y1, x2, y2))
+
+    def curveto(self, ctx, x1, y1, x2, y2, x3, y3):
+        self.context.curveto(ctx, *self._apply(x1, y1, x2, y2, x3, y3))
+
+    def mark_knot(self, ctx, knot_idx):
+        self.context.mark_knot(ctx, knot_idx)
+
+
+def _checkmatrix(matrix):
+    """Unpack an affine transformation matrix into a tuple."""
+    matrix = tuple(matrix)
+    if len(matrix) != 6:
+        raise ValueError('a transformation matrix must have six values')
+    if not all(isinstance(n, Real) for n in matrix):
+        raise TypeError('matrix values must be real numeric')
+    return matrix
+
+
 class SVGPathContext(BezierContext):
     """Generate Bézier curves as SVG path data.
 
@@ -171,3 +225,181 @@ class SVGPathContext(BezierContext):
                                                                       x3, y3)
                                             )),
               end=' ', file=self.file)
+
+
+class SVGDocument:
+    """Write many paths into a single SVG document.
+
+    Use this class as a context manager, passing it a filename or a
+    file-like object. Each path is then generated in a context obtained
+    from the path() method, whose keyword arguments become attributes
+    of the path element (with underscores changed to hyphens):
+        >>> with SVGDocument('sheet.svgz', 800, 600, compress=True) as doc:
+        ...     for points in paths:
+        ...         with doc.path(fill='none', stroke_width=2) as ctx:
+        ...             spiro.tagged_to_bezier(points, ctx)
+
+    The file is opened when the document is entered, and closed (if it
+    was opened by the document) on exit. Path data is written straight
+    through to the file, so memory use does not grow with the size of
+    the document. All paths share the same path context and number
+    formatting.
+
+    If compress is true, the document is written gzip-compressed. This
+    is not possible when writing to a text stream; pass a filename or
+    a binary file-like object instead.
+
+    """
+    _header = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<svg xmlns="http://www.w3.org/2000/svg"{}>\n')
+    _footer = '</svg>\n'
+
+    def __init__(self, file, width=None, height=None, view_box=None,
+                 compress=False, precision=6,
+                 buffer_size=io.DEFAULT_BUFFER_SIZE, **kwargs):
+        self._fmt = ('{:.' + str(int(precision)) + '}').format
+        attrs = self._hyphenate(kwargs)
+        attrs.update(width=width, height=height,
+                     viewBox=(None if view_box is None else
+                              ' '.join(self._numstr(n) for n in view_box)))
+        self._root_attrs = self._attrstr(attrs)
+        if compress and isinstance(file, io.TextIOBase):
+            raise ValueError('cannot compress output to a text stream')
+        self._target = file, compress, buffer_size
+        # The output stream, while the document is entered.
+        self.file = None
+        self._finish = None
+        self._path = _SVGDocumentPath(self)
+
+    @staticmethod
+    def _open(file, compress, buffer_size):
+        """Get a buffered text stream, and how to finish with it."""
+        if not hasattr(file, 'write'):
+            # A filename.
+            if compress:
+                stream = gzip.open(file, 'wt', encoding='utf-8')
+            else:
+                stream = open(file, 'wt', encoding='utf-8',
+                              buffering=buffer_size)
+            return stream, stream.close
+        elif isinstance(file, io.TextIOBase):
+            return file, file.flush
+        elif compress:
+            # Closing the GzipFile does not close the underlying file.
+            stream = io.TextIOWrapper(gzip.GzipFile(fileobj=file, mode='wb'),
+                                      encoding='utf-8')
+            return stream, stream.close
+        else:
+            stream = io.TextIOWrapper(file, encoding='utf-8')
+            def finish():
+                stream.flush()
+                stream.detach()
+            return stream, finish
+
+    def __enter__(self):
+        """Enter the context manager, writing the document header."""
+        if self.file is not None:
+            raise RuntimeError('the document has already been entered')
+        self.file, self._finish = self._open(*self._target)
+        self._path.file = self.file
+        try:
+            self.file.write(self._header.format(self._root_attrs))
+        except Exception:
+            self._close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context manager.
+
+        If an exception has resulted, the document is left unfinished.
+        Otherwise, the closing tag is written. Either way, a file opened
+        by this document is closed.
+
+        """
+        try:
+            if exc_type is None:
+                self.file.write(self._footer)
+        finally:
+            self._close()
+
+    def _close(self):
+        """Finish with the output stream."""
+        try:
+            self._finish()
+        finally:
+            self.file = self._path.file = self._finish = None
+
+    def _numstr(self, n):
+        """Number-to-string conversion with the document's precision."""
+        return str(int(n)) if int(n) == n else self._fmt(n)
+
+    @staticmethod
+    def _hyphenate(kwargs):
+        """Turn keyword arguments into attribute names and values."""
+        return {name.replace('_', '-'): value
+                for name, value in kwargs.items()}
+
+    def _attrstr(self, attrs):
+        """Format attributes, skipping any whose value is None."""
+        return ''.join(' {}={}'.format(name,
+                                       quoteattr(self._numstr(value)
+                                                 if isinstance(value, float)
+                                                 else str(value)))
+                       for name, value in attrs.items() if value is not None)
+
+    def path(self, attrs=None, **kwargs):
+        """Get the context manager in which to generate the next path.
+
+        Attributes may be given as a mapping, as keyword arguments, or
+        both; names in the mapping are used unchanged. The path element
+        is begun when the context manager is entered, and finished when
+        it exits, so the result must be used in a with statement. Only
+        one path can be generated at a time; a path that was never
+        entered is discarded when the next one is requested.
+
+        """
+        if self.file is None:
+            raise RuntimeError('paths can only be generated while the '
+                               'document is entered')
+        if self._path.active:
+            raise RuntimeError('a path is already being generated')
+        attrs = dict(() if attrs is None else attrs)
+        attrs.update(self._hyphenate(kwargs))
+        self._path.pending = self._attrstr(attrs)
+        return self._path
+
+
+class _SVGDocumentPath(SVGPathContext):
+    """The path context shared by all paths in an SVGDocument."""
+    def __init__(self, document):
+        super().__init__(document.file)
+        self._numstr = document._numstr
+        # Attributes of the path to be begun on entry, if any.
+        self.pending = None
+        self.active = False
+
+    def __enter__(self):
+        """Enter the context manager, beginning the path element."""
+        if self.pending is None:
+            raise RuntimeError('paths must be started with '
+                               'SVGDocument.path()')
+        self.file.write('<path{} d="'.format(self.pending))
+        self.pending = None
+        self.active = True
+        self._first_subpath = True
+        self.is_open = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context manager, finishing the path element.
+
+        If an exception has resulted, the path is not closed, but the
+        element is still finished (holding whatever path data had been
+        generated), so that the document remains well-formed if the
+        exception is handled.
+
+        """
+        self.active = False
+        super().__exit__(exc_type, exc_value, traceback)
+        self.file.write('"/>\n')
@@ -21,7 +21,7 @@
 # You should have received a copy of the GNU General Public License
 # along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ['CPType', 'ControlPoints']
+__all__ = ['CPType', 'ControlPoints', 'PackedControlPoints']
 
 # Standard library imports.
 from collections import namedtuple
@@ -31,8 +31,9 @@ try:
 except ImportError:
     # Python pre-3.3
     from collections import MutableSequence, Sequence
-from ctypes import pointer, Structure, c_double, c_char
+from ctypes import Array, pointer, sizeof, Structure, c_double, c_char
 from numbers import Real
+import struct
 
 # Native interface definitions.
 class spiro_cp(Structure):
@@ -41,6 +42,17 @@ class spiro_cp(Structure):
                 ('ty', c_char)]
 
 
+class spiro_seg(Structure):
+    _fields_ = [('x', c_double),
+                ('y', c_double),
+                ('ty', c_char),
+                ('bend_th', c_double),
+                ('ks', c_double * 4),
+                ('seg_ch', c_double),
+                ('seg_th', c_double),
+                ('l', c_double)]
+
+
 CPType = namedtuple('CPType_tuple',
                     ('corner', 'g4', 'g2', 'left', 'right', 'end',
                      'open_contour', 'end_open_contour')
@@ -58,7 +70,12 @@ class ControlPoints(MutableSequence):
     @classmethod
     def from_param(cls, obj):
         """Adapt sequence types for native function calls."""
-        if isinstance(obj, Sequence):
+        if isinstance(obj, Array) and obj._type_ is spiro_cp:
+            # Already adapted.
+            return obj
+        elif isinstance(obj, PackedControlPoints):
+            return obj.as_native()
+        elif isinstance(obj, Sequence):
             points = list(spiro_cp(*point) for point in obj)
             return (spiro_cp * len(obj))(*points)
         else:
@@ -92,3 +109,88 @@ class ControlPoints(MutableSequence):
 
     def insert(self, index, val):
         self._seq.insert(index, self._checkval(val))
+
+
+# Packed layout of spiro_cp, including any trailing padding.
+_cp_struct = struct.Struct('@ddc{}x'.format(sizeof(spiro_cp) -
+                                            struct.calcsize('@ddc')))
+_cp_types = frozenset(CPType)
+
+class PackedControlPoints(Sequence):
+    """A compact, append-only sequence of spiro control points.
+
+    Points are stored in a single bytearray with the same layout as the
+    native array that libspiro expects. On common 64-bit platforms,
+    each point takes sizeof(spiro_cp) = 24 bytes, or about 25 bytes
+    allowing for the bytearray's over-allocation. A list of (x, y,
+    cptype) tuples takes about 120 bytes per point (the list slot, the
+    tuple and two floats), so this is roughly 4.8 times smaller.
+    Adapting this sequence for native function calls does not copy it.
+
+    Indexing returns (x, y, cptype) tuples, and append() and extend()
+    take them, as for ControlPoints. The builder method add_point()
+    takes the coordinates and type as separate arguments, and close()
+    and end_open() add the markers that end a "tagged" sequence:
+        >>> cps = PackedControlPoints()
+        >>> cps.add_point(0, 0, CPType.open_contour)
+        >>> cps.add_point(100, 50)
+        >>> cps.end_open(200, 0)
+        >>> spiro.tagged_to_bezier(cps, ctx)
+
+    Note that the sequence cannot grow while a native array adapted
+    from it (by as_native() or from_param()) is still in use.
+
+    """
+    __slots__ = ('_buf',)
+
+    def __init__(self, seq=None):
+        self._buf = bytearray()
+        if seq is not None:
+            self.extend(seq)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        # Normalise the index, raising IndexError if it is out of range.
+        index = range(len(self))[index]
+        return _cp_struct.unpack_from(self._buf, index * _cp_struct.size)
+
+    def __len__(self):
+        return len(self._buf) // _cp_struct.size
+
+    def add_point(self, x, y, cptype=CPType.g4):
+        """Add a control point, given its coordinates and type."""
+        if cptype not in _cp_types:
+            raise ValueError('unknown control point type: {!r}'.format(cptype))
+        try:
+            self._buf += _cp_struct.pack(x, y, cptype)
+        except struct.error:
+            raise TypeError('coordinates must be real numeric') from None
+
+    def append(self, point):
+        """Add an (x, y, cptype) control point."""
+        # Unpack the point, raising a TypeError if it is not iterable, and a
+        # ValueError if it is the wrong length.
+        x, y, cptype = point
+        self.add_point(x, y, cptype)
+
+    def extend(self, points):
+        """Add a sequence of (x, y, cptype) control points."""
+        for point in points:
+            self.append(point)
+
+    def close(self):
+        """End a tagged sequence of points as a closed curve."""
+        self.add_point(0, 0, CPType.end)
+
+    def end_open(self, x, y):
+        """End a tagged sequence of points as an open curve."""
+        self.add_point(x, y, CPType.end_open_contour)
+
+    def clear(self):
+        """Remove all control points."""
+        del self._buf[:]
+
+    def as_native(self):
+        """Get a native array sharing this sequence's storage."""
+        return (spiro_cp * len(self)).from_buffer(self._buf)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+"""Spatial indexing of generated Bézier segments."""
+
+# Copyright © 2015, 2016 Timothy Pederick.
+# Based on libspiro:
+#     Copyright © 2007 Raph Levien
+#
+# This file is part of PySpiro.
+#
+# PySpiro is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PySpiro is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ['IndexContext', 'SegmentIndex']
+
+# Standard library imports.
+from array import array
+from math import floor, hypot
+
+# Local imports.
+from ._segments import SegmentArray, SegType, _distance
+
+# Segments are halved at most this many times when finding their cells.
+_MAX_DEPTH = 24
+
+class SegmentIndex:
+    """A uniform grid index over the segments of many paths.
+
+    Each path is identified by a hashable path ID chosen by the caller,
+    and its segments are supplied as a SegmentArray. Every drawn segment
+    is registered in each grid cell that it passes through, so that
+    queries only need to examine nearby segments. Each cell holds a
+    packed array of (path key, segment index) pairs, where path keys are
+    small integers assigned to path IDs in the order they are indexed.
+
+    The cell size should be comparable to the typical segment length;
+    much smaller cells waste memory, and much larger ones make queries
+    examine too many segments.
+
+    Use the updating() method to index a path as it is generated:
+        >>> index = SegmentIndex()
+        >>> with index.updating('glyph-a') as ctx:
+        ...     spiro.tagged_to_bezier(points, ctx)
+
+    """
+    def __init__(self, cell_size=64.0):
+        if not cell_size > 0:
+            raise ValueError('cell size must be positive')
+        self.cell_size = float(cell_size)
+        # Maps path IDs to (path key, segments, bounding boxes, cells).
+        self._paths = {}
+        # Maps path keys back to path IDs.
+        self._path_ids = {}
+        self._next_key = 0
+        # Maps (column, row) cells to arrays of path keys interleaved with
+        # segment indices.
+        self._grid = {}
+        self._extent = None
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, path_id):
+        return path_id in self._paths
+
+    def updating(self, path_id):
+        """Get a context that replaces a path's segments on exit."""
+        return IndexContext(self, path_id)
+
+    def _cell_range(self, x0, y0, x1, y1):
+        size = self.cell_size
+        return (range(floor(x0 / size), floor(x1 / size) + 1),
+                range(floor(y0 / size), floor(y1 / size) + 1))
+
+    def _segment_cells(self, coords):
+        """Find the cells that a segment passes through.
+
+        The segment is halved until each piece's control points lie
+        within two columns and two rows of cells. Since a Bézier curve
+        lies within the bounding box of its control points, the cells
+        found this way cover the whole segment.
+
+        """
+        cells = set()
+        pieces = [(coords, 0)]
+        while pieces:
+            piece, depth = pieces.pop()
+            xs, ys = piece[0::2], piece[1::2]
+            columns, rows = self._cell_range(min(xs), min(ys),
+                                             max(xs), max(ys))
+            if (len(columns) <= 2 and len(rows) <= 2 or
+                    depth == _MAX_DEPTH):
+                cells.update((col, row) for col in columns for row in rows)
+            else:
+                pieces.extend((half, depth + 1) for half in _bisect(piece))
+        return cells
+
+    def update(self, path_id, segments):
+        """Add a path's segments, replacing any already indexed."""
+        try:
+            key = self._paths[path_id][0]
+        except KeyError:
+            key = self._next_key
+            self._next_key += 1
+        self.remove(path_id)
+        boxes = array('d')
+        cells = set()
+        for seg_idx, (segtype, coords, _) in enumerate(segments):
+            if segtype in (SegType.moveto, SegType.moveto_open):
+                # Keep the bounding boxes aligned with segment indices.
+                boxes.extend(coords * 2)
+                continue
+            boxes.extend(segments.bounds(seg_idx))
+            for cell in self._segment_cells(coords):
+                entries = self._grid.get(cell)
+                if entries is None:
+                    entries = self._grid[cell] = array('L')
+                entries.extend((key, seg_idx))
+                cells.add(cell)
+        self._paths[path_id] = (key, segments, boxes, cells)
+        self._path_ids[key] = path_id
+        self._extent = None
+
+    def remove(self, path_id):
+        """Remove a path from the index, if it is present."""
+        try:
+            key, _, _, cells = self._paths.pop(path_id)
+        except KeyError:
+            return
+        del self._path_ids[key]
+        for cell in cells:
+            entries = self._grid[cell]
+            kept = array('L')
+            for i in range(0, len(entries), 2):
+                if entries[i] != key:
+                    kept.extend(entries[i:i + 2])
+            if kept:
+                self._grid[cell] = kept
+            else:
+                del self._grid[cell]
+        self._extent = None
+
+    def clear(self):
+        """Remove all paths from the index."""
+        self._paths.clear()
+        self._path_ids.clear()
+        self._grid.clear()
+        self._extent = None
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Find segments that may meet a rectangle.
+
+        A segment is found if its tight bounding box meets the rectangle
+        and it passes through a grid cell that the rectangle overlaps.
+        The result is a list of unique (path_id, knot_idx) pairs, ordered
+        by when each path was first indexed and then by knot index.
+
+        """
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        extent = self._get_extent()
+        if extent is None:
+            return []
+        # Only cells within the grid's extent can hold any segments.
+        min_col, min_row, max_col, max_row = extent
+        columns, rows = self._cell_range(x0, y0, x1, y1)
+        columns = range(max(columns.start, min_col),
+                        min(columns.stop, max_col + 1))
+        rows = range(max(rows.start, min_row), min(rows.stop, max_row + 1))
+        if len(columns) * len(rows) > len(self._grid):
+            cells = (entries for cell, entries in self._grid.items()
+                     if cell[0] in columns and cell[1] in rows)
+        else:
+            cells = (self._grid.get((col, row), ())
+                     for col in columns for row in rows)
+
+        found = set()
+        for entries in cells:
+            for i in range(0, len(entries), 2):
+                key, seg_idx = entries[i], entries[i + 1]
+                _, segments, boxes, _ = self._paths[self._path_ids[key]]
+                bx0, by0, bx1, by1 = boxes[4 * seg_idx:4 * seg_idx + 4]
+                if bx0 <= x1 and x0 <= bx1 and by0 <= y1 and y0 <= by1:
+                    found.add((key, segments.knots[seg_idx]))
+        # Sort by path key, since path IDs need not be mutually orderable.
+        return [(self._path_ids[key], knot_idx)
+                for key, knot_idx in sorted(found)]
+
+    def _get_extent(self):
+        """Get the (min_col, min_row, max_col, max_row) of occupied cells."""
+        if self._extent is None and self._grid:
+            columns, rows = zip(*self._grid)
+            self._extent = min(columns), min(rows), max(columns), max(rows)
+        return self._extent
+
+    def nearest(self, x, y, max_distance=None):
+        """Find the segment nearest to a point.
+
+        The result is a (path_id, knot_idx, distance) tuple, or None if
+        no segment lies within max_distance (or the index is empty).
+        Distances to curves are approximated by flattening them.
+
+        """
+        extent = self._get_extent()
+        if extent is None:
+            return None
+        min_col, min_row, max_col, max_row = extent
+
+        size = self.cell_size
+        col, row = floor(x / size), floor(y / size)
+        # Rings nearer than this radius cannot contain any segments, nor
+        # can rings beyond the other radius.
+        min_ring = max(min_col - col, col - max_col, min_row - row,
+                       row - max_row, 0)
+        max_ring = max(abs(col - min_col), abs(col - max_col),
+                       abs(row - min_row), abs(row - max_row))
+        best = (float('inf') if max_distance is None else max_distance,
+                None, None)
+        seen = set()
+        for ring in range(min_ring, max_ring + 1):
+            for cell in _ring_cells(col, row, ring, extent):
+                entries = self._grid.get(cell, ())
+                for i in range(0, len(entries), 2):
+                    key, seg_idx = entries[i], entries[i + 1]
+                    if (key, seg_idx) in seen:
+                        continue
+                    seen.add((key, seg_idx))
+                    path_id = self._path_ids[key]
+                    _, segments, boxes, _ = self._paths[path_id]
+                    bx0, by0, bx1, by1 = boxes[4 * seg_idx:4 * seg_idx + 4]
+                    # The box distance is a lower bound on the true one.
+                    if hypot(max(bx0 - x, 0, x - bx1),
+                             max(by0 - y, 0, y - by1)) > best[0]:
+                        continue
+                    segtype, coords, knot_idx = segments[seg_idx]
+                    distance = _distance(segtype, coords, x, y)
+                    if distance <= best[0]:
+                        best = (distance, path_id, knot_idx)
+            # Every cell in the next ring is at least this far away.
+            if best[0] <= ring * size:
+                break
+        distance, path_id, knot_idx = best
+        return None if path_id is None else (path_id, knot_idx, distance)
+
+
+def _bisect(coords):
+    """Split a Bézier segment, given as flat coordinates, at t = 0.5."""
+    # De Casteljau's algorithm: the first and last points of each level
+    # of midpoints are the control points of the two halves.
+    first, last = [], []
+    level = list(coords)
+    while level:
+        first.extend(level[:2])
+        last[:0] = level[-2:]
+        level = [(a + b) / 2 for a, b in zip(level, level[2:])]
+    return tuple(first), tuple(last)
+
+def _ring_cells(col, row, ring, extent):
+    """Generate the cells at a given Chebyshev distance from a cell.
+
+    Only cells within the extent (min_col, min_row, max_col, max_row)
+    are generated.
+
+    """
+    min_col, min_row, max_col, max_row = extent
+    if ring == 0:
+        yield col, row
+        return
+    # The top and bottom edges of the ring, including the corners.
+    columns = range(max(col - ring, min_col), min(col + ring, max_col) + 1)
+    for edge_row in (row - ring, row + ring):
+        if min_row <= edge_row <= max_row:
+            for edge_col in columns:
+                yield edge_col, edge_row
+    # The left and right edges, excluding the corners.
+    rows = range(max(row - ring + 1, min_row),
+                 min(row + ring - 1, max_row) + 1)
+    for edge_col in (col - ring, col + ring):
+        if min_col <= edge_col <= max_col:
+            for edge_row in rows:
+                yield edge_col, edge_row
+
+
+class IndexContext(SegmentArray):
+    """Record a path's segments and add them to a SegmentIndex.
+
+    Use this class as a context manager, as returned by the updating()
+    method of SegmentIndex. On exit, the recorded segments replace any
+    already indexed for the same path ID. If an exception has resulted,
+    the index is left unchanged.
+
+    """
+    def __init__(self, index, path_id):
+        super().__init__()
+        self.index = index
+        self.path_id = path_id
+
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context manager, updating the index."""
+        if exc_type is None:
+            self.index.update(self.path_id, self)
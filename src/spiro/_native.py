@@ -21,7 +21,8 @@
 # You should have received a copy of the GNU General Public License
 # along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ['TaggedSpiroCPsToBezier', 'SpiroCPsToBezier']
+__all__ = ['TaggedSpiroCPsToBezier', 'SpiroCPsToBezier', 'free_spiro',
+           'run_spiro', 'spiro_to_bpath']
 
 # Standard library imports
 import ctypes
@@ -29,7 +30,7 @@ import sys
 
 # Local imports.
 from ._context import BezierContext
-from ._cp import ControlPoints
+from ._cp import ControlPoints, spiro_seg
 
 # Native library import.
 libname = 'libspiro'
@@ -57,3 +58,19 @@ spiro.SpiroCPsToBezier.argtypes = (ControlPoints, ctypes.c_int,
                                    ctypes.c_int, BezierContext)
 spiro.SpiroCPsToBezier.restype = None
 SpiroCPsToBezier = spiro.SpiroCPsToBezier
+
+# spiro_seg *run_spiro(const spiro_cp *src, int n);
+spiro.run_spiro.argtypes = (ControlPoints, ctypes.c_int)
+spiro.run_spiro.restype = ctypes.POINTER(spiro_seg)
+run_spiro = spiro.run_spiro
+
+# void free_spiro(spiro_seg *s);
+spiro.free_spiro.argtypes = (ctypes.POINTER(spiro_seg),)
+spiro.free_spiro.restype = None
+free_spiro = spiro.free_spiro
+
+# void spiro_to_bpath(const spiro_seg *s, int n, bezctx *bc);
+spiro.spiro_to_bpath.argtypes = (ctypes.POINTER(spiro_seg), ctypes.c_int,
+                                 BezierContext)
+spiro.spiro_to_bpath.restype = None
+spiro_to_bpath = spiro.spiro_to_bpath
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+"""Packed storage of generated Bézier segments."""
+
+# Copyright © 2015, 2016 Timothy Pederick.
+# Based on libspiro:
+#     Copyright © 2007 Raph Levien
+#
+# This file is part of PySpiro.
+#
+# PySpiro is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PySpiro is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ['SegmentArray', 'SegType']
+
+# Standard library imports.
+from array import array
+from collections import namedtuple
+try:
+    # Python 3.3+
+    from collections.abc import Sequence
+except ImportError:
+    # Python pre-3.3
+    from collections import Sequence
+from math import hypot, sqrt
+
+# Local imports.
+from ._context import BezierContext, _checkmatrix
+
+SegType = namedtuple('SegType_tuple',
+                     ('moveto', 'moveto_open', 'lineto', 'quadto', 'curveto')
+                     )(b'M', b'{', b'L', b'Q', b'C')
+
+# Number of coordinates stored for each segment type.
+_coord_count = {SegType.moveto: 2, SegType.moveto_open: 2,
+                SegType.lineto: 2, SegType.quadto: 4, SegType.curveto: 6}
+
+class SegmentArray(BezierContext, Sequence):
+    """A context that records Bézier segments in packed arrays.
+
+    Rather than holding a Python object per segment, all segments are
+    stored in four parallel arrays:
+        * ops: A bytearray of segment types, one of the SegType values.
+        * starts: The offset of each segment's coordinates in coords.
+        * coords: A flat array of doubles holding the coordinates that
+            were passed to each callback, in order.
+        * knots: The knot index most recently marked (via mark_knot)
+            when each segment was generated, or -1 if none was marked.
+
+    Indexing returns a (segtype, coordinates, knot_idx) tuple, where
+    coordinates is a tuple of all the points defining the segment,
+    including its starting point (so a "line to" segment has four
+    coordinates, not two). A "move to" segment has only its own point.
+
+    """
+    def __init__(self):
+        self.ops = bytearray()
+        self.starts = array('L')
+        self.coords = array('d')
+        self.knots = array('l')
+        self._knot = -1
+
+    def clear(self):
+        """Discard all recorded segments."""
+        del self.ops[:], self.starts[:], self.coords[:], self.knots[:]
+        self._knot = -1
+
+    def _append(self, segtype, *coords):
+        self.ops += segtype
+        self.starts.append(len(self.coords))
+        self.coords.extend(coords)
+        self.knots.append(self._knot)
+
+    def moveto(self, ctx, x, y, is_open):
+        self._append(SegType.moveto_open if is_open else SegType.moveto, x, y)
+
+    def lineto(self, ctx, x, y):
+        self._append(SegType.lineto, x, y)
+
+    def quadto(self, ctx, x1, y1, x2, y2):
+        self._append(SegType.quadto, x1, y1, x2, y2)
+
+    def curveto(self, ctx, x1, y1, x2, y2, x3, y3):
+        self._append(SegType.curveto, x1, y1, x2, y2, x3, y3)
+
+    def mark_knot(self, ctx, knot_idx):
+        self._knot = knot_idx
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        # Normalise the index, raising IndexError if it is out of range.
+        index = range(len(self))[index]
+        segtype = bytes(self.ops[index:index + 1])
+        start = self.starts[index]
+        end = start + _coord_count[segtype]
+        if segtype in (SegType.moveto, SegType.moveto_open):
+            coords = tuple(self.coords[start:end])
+        elif index == 0:
+            raise ValueError('segment {} has no starting '
+                             'point'.format(index))
+        else:
+            coords = tuple(self.coords[start - 2:end])
+        return segtype, coords, self.knots[index]
+
+    def copy(self):
+        """Get a copy of this array of segments."""
+        other = SegmentArray()
+        other.ops[:] = self.ops
+        other.starts.extend(self.starts)
+        other.coords.extend(self.coords)
+        other.knots.extend(self.knots)
+        return other
+
+    def transformed(self, matrix):
+        """Get a copy of these segments with an affine transformation.
+
+        The matrix is given as six numbers (a, b, c, d, e, f), as for
+        TransformContext. All coordinates are transformed in one pass.
+
+        """
+        a, b, c, d, e, f = _checkmatrix(matrix)
+        other = self.copy()
+        xs, ys = self.coords[0::2], self.coords[1::2]
+        other.coords[0::2] = array('d', [a * x + c * y + e
+                                         for x, y in zip(xs, ys)])
+        other.coords[1::2] = array('d', [b * x + d * y + f
+                                         for x, y in zip(xs, ys)])
+        return other
+
+    def replay(self, context, matrix=None):
+        """Generate the recorded segments again in another context.
+
+        If a matrix is given, the segments are transformed first. Knots
+        are marked again wherever the recorded knot index changes.
+
+        """
+        source = self if matrix is None else self.transformed(matrix)
+        coords, knot = source.coords, -1
+        # Iterating over a bytearray gives integers, not bytes.
+        moveto, moveto_open = SegType.moveto[0], SegType.moveto_open[0]
+        callbacks = {SegType.lineto[0]: (context.lineto, 2),
+                     SegType.quadto[0]: (context.quadto, 4),
+                     SegType.curveto[0]: (context.curveto, 6)}
+        for op, start, next_knot in zip(source.ops, source.starts,
+                                        source.knots):
+            if next_knot != knot:
+                knot = next_knot
+                if knot >= 0:
+                    context.mark_knot(None, knot)
+            if op == moveto or op == moveto_open:
+                context.moveto(None, coords[start], coords[start + 1],
+                               op == moveto_open)
+            else:
+                callback, count = callbacks[op]
+                callback(None, *coords[start:start + count])
+
+    def bounds(self, index):
+        """Get the bounding box (x0, y0, x1, y1) of a segment."""
+        segtype, coords, _ = self[index]
+        return _bounds(segtype, coords)
+
+
+# Geometry helpers for segments in the form returned by SegmentArray.
+def _bounds(segtype, coords):
+    """Calculate the tight bounding box of a segment."""
+    # Only the end points and any extrema lie on the curve itself.
+    xs, ys = [coords[0], coords[-2]], [coords[1], coords[-1]]
+    if segtype == SegType.quadto:
+        xs.extend(_quad_extrema(*coords[0::2]))
+        ys.extend(_quad_extrema(*coords[1::2]))
+    elif segtype == SegType.curveto:
+        xs.extend(_cubic_extrema(*coords[0::2]))
+        ys.extend(_cubic_extrema(*coords[1::2]))
+    return min(xs), min(ys), max(xs), max(ys)
+
+def _quad_extrema(p0, p1, p2):
+    """Find the interior extremum of a 1-D quadratic Bézier, if any."""
+    denom = p0 - 2 * p1 + p2
+    if denom == 0:
+        return []
+    t = (p0 - p1) / denom
+    if 0 < t < 1:
+        mt = 1 - t
+        return [mt * mt * p0 + 2 * mt * t * p1 + t * t * p2]
+    return []
+
+def _cubic_extrema(p0, p1, p2, p3):
+    """Find the interior extrema of a 1-D cubic Bézier."""
+    # The derivative is a quadratic, a*t**2 + b*t + c.
+    a = -p0 + 3 * p1 - 3 * p2 + p3
+    b = 2 * (p0 - 2 * p1 + p2)
+    c = p1 - p0
+    if abs(a) < 1e-12:
+        roots = [] if b == 0 else [-c / b]
+    else:
+        disc = b * b - 4 * a * c
+        if disc < 0:
+            roots = []
+        else:
+            root = sqrt(disc)
+            roots = [(-b + root) / (2 * a), (-b - root) / (2 * a)]
+    return [_cubic_point(p0, p1, p2, p3, t) for t in roots if 0 < t < 1]
+
+def _cubic_point(p0, p1, p2, p3, t):
+    """Evaluate a 1-D cubic Bézier at parameter t."""
+    mt = 1 - t
+    return (mt * mt * mt * p0 + 3 * mt * mt * t * p1 +
+            3 * mt * t * t * p2 + t * t * t * p3)
+
+def _flatten(segtype, coords, steps=16):
+    """Approximate a segment by a list of points along it."""
+    if segtype in (SegType.moveto, SegType.moveto_open, SegType.lineto):
+        return list(zip(coords[0::2], coords[1::2]))
+    if segtype == SegType.quadto:
+        x0, y0, x1, y1, x2, y2 = coords
+        # Elevate to a cubic.
+        coords = (x0, y0, x0 + 2 * (x1 - x0) / 3, y0 + 2 * (y1 - y0) / 3,
+                  x2 + 2 * (x1 - x2) / 3, y2 + 2 * (y1 - y2) / 3, x2, y2)
+    xs, ys = coords[0::2], coords[1::2]
+    return [(_cubic_point(*xs, t=i / steps), _cubic_point(*ys, t=i / steps))
+            for i in range(steps + 1)]
+
+def _distance(segtype, coords, x, y):
+    """Approximate the distance from a point to a segment."""
+    points = _flatten(segtype, coords)
+    if len(points) == 1:
+        return hypot(x - points[0][0], y - points[0][1])
+    best = float('inf')
+    for (ax, ay), (bx, by) in zip(points, points[1:]):
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        t = (0 if length_sq == 0 else
+             max(0, min(1, ((x - ax) * dx + (y - ay) * dy) / length_sq)))
+        best = min(best, hypot(x - ax - t * dx, y - ay - t * dy))
+    return best
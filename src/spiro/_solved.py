@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+"""Solved Spiro curves, sampled by arc length."""
+
+# Copyright © 2015, 2016 Timothy Pederick.
+# Based on libspiro:
+#     Copyright © 2007 Raph Levien
+#
+# This file is part of PySpiro.
+#
+# PySpiro is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PySpiro is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ['SolvedSpiro', 'SpiroSamples']
+
+# Standard library imports.
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from math import atan2, cos, hypot, sin, sqrt
+
+# Local imports.
+from ._cp import ControlPoints, CPType
+from ._native import free_spiro, run_spiro, spiro_to_bpath
+from ._segments import SegmentArray
+
+SpiroSamples = namedtuple('SpiroSamples', ('x', 'y', 'dx', 'dy', 'curvature'))
+
+# Each segment is divided into this many equal pieces, whose integrals
+# are precomputed, so that sampling only integrates over a short span.
+_PIECES = 16
+
+# Four-point Gauss-Legendre quadrature on [-1, 1].
+_GAUSS = ((-sqrt(3 / 7 + 2 / 7 * sqrt(6 / 5)), (18 - sqrt(30)) / 36),
+          (-sqrt(3 / 7 - 2 / 7 * sqrt(6 / 5)), (18 + sqrt(30)) / 36),
+          (sqrt(3 / 7 - 2 / 7 * sqrt(6 / 5)), (18 + sqrt(30)) / 36),
+          (sqrt(3 / 7 + 2 / 7 * sqrt(6 / 5)), (18 - sqrt(30)) / 36))
+
+class SolvedSpiro:
+    """A Spiro curve solved by the native library.
+
+    Each segment of a Spiro curve is a polynomial spiral, whose tangent
+    angle is a polynomial in arc length. This lets positions, tangents
+    and curvature be found at any distance along the curve directly,
+    without generating Bézier curves first.
+
+    Bézier curves can still be generated with the to_bezier() method.
+    They are cached, so generating them again (for instance, with a
+    different transformation) does not repeat any native calls.
+
+    Create instances with the solve() and tagged_solve() functions, or
+    with the constructor, which takes the same arguments as to_bezier().
+
+    """
+    def __init__(self, points, is_closed):
+        self._solve(points, len(points), is_closed, not is_closed)
+
+    @classmethod
+    def from_tagged(cls, points):
+        """Solve a "tagged" sequence of Spiro points."""
+        # Adapt the points first, so that native arrays (whose items
+        # cannot be indexed) are handled too.
+        cps = ControlPoints.from_param(points)
+        for n, cp in enumerate(cps):
+            if cp.ty in (CPType.end, CPType.end_open_contour):
+                break
+        else:
+            raise ValueError('tagged points must end with {!r} or '
+                             '{!r}'.format(CPType.end,
+                                           CPType.end_open_contour))
+        if cp.ty == CPType.end_open_contour:
+            n += 1
+        self = cls.__new__(cls)
+        self._solve(cps, n, cps[0].ty != CPType.open_contour, False)
+        return self
+
+    def _solve(self, points, n, is_closed, mark_ends):
+        """Solve the first n points, optionally marking open ends."""
+        if n < 2:
+            raise ValueError('cannot solve fewer than two points')
+        cps = ControlPoints.from_param(points)
+        if mark_ends:
+            # As in SpiroCPsToBezier(), temporarily mark the end points.
+            old_types = cps[0].ty, cps[n - 1].ty
+            cps[0].ty = CPType.open_contour
+            cps[n - 1].ty = CPType.end_open_contour
+        try:
+            self._segs = run_spiro(cps, n)
+        finally:
+            if mark_ends:
+                cps[0].ty, cps[n - 1].ty = old_types
+        if not self._segs:
+            raise ValueError('the points could not be solved')
+        self._n = n
+        self._segments = None
+        self.is_closed = is_closed
+        self._prepare(n if is_closed else n - 1)
+
+    def __del__(self):
+        segs = getattr(self, '_segs', None)
+        if segs:
+            free_spiro(segs)
+            self._segs = None
+
+    def _prepare(self, n_seg):
+        """Precompute the geometry of each segment."""
+        # Per segment: start point, scale, rotation and curvature terms.
+        self._geometry = []
+        # Per segment: integrals from its start to each piece boundary.
+        self._tables = []
+        self.offsets = array('d', [0.0])
+        for i in range(n_seg):
+            seg, next_seg = self._segs[i], self._segs[i + 1]
+            ks = tuple(seg.ks)
+            table = array('d', [0.0, 0.0])
+            for j in range(_PIECES):
+                u0 = -0.5 + j / _PIECES
+                ix, iy = _integrate(ks, u0, u0 + 1 / _PIECES)
+                table.extend((table[-2] + ix, table[-1] + iy))
+            seg_ch = hypot(next_seg.x - seg.x, next_seg.y - seg.y)
+            seg_th = atan2(next_seg.y - seg.y, next_seg.x - seg.x)
+            ch = hypot(table[-2], table[-1])
+            scale = 0.0 if ch == 0 else seg_ch / ch
+            rot = seg_th - atan2(table[-1], table[-2])
+            self._geometry.append((seg.x, seg.y, scale, rot, ks))
+            self._tables.append(table)
+            # The spiral has unit length before scaling.
+            self.offsets.append(self.offsets[-1] + scale)
+
+    @property
+    def segments(self):
+        """The Bézier curves for this curve, as a SegmentArray."""
+        if self._segments is None:
+            self._segments = SegmentArray()
+            spiro_to_bpath(self._segs, self._n, self._segments)
+        return self._segments
+
+    def to_bezier(self, context, matrix=None):
+        """Generate Bézier curves, optionally transformed.
+
+        The matrix, if given, is six numbers (a, b, c, d, e, f), as for
+        TransformContext.
+
+        """
+        self.segments.replay(context, matrix)
+
+    @property
+    def length(self):
+        """The total arc length of the curve."""
+        return self.offsets[-1]
+
+    def sample(self, positions):
+        """Sample the curve at the given arc-length positions.
+
+        The result is a SpiroSamples tuple of arrays, holding the x and
+        y coordinates, the unit tangent (dx, dy), and the signed
+        curvature at each position. Positions on closed curves wrap
+        around; on open curves, they must lie between 0 and the length.
+
+        """
+        length = self.length
+        n_seg = len(self._geometry)
+        result = SpiroSamples(*(array('d') for _ in SpiroSamples._fields))
+        for pos in positions:
+            if self.is_closed and length > 0:
+                pos %= length
+            elif not 0 <= pos <= length:
+                raise ValueError('position {!r} is outside the curve, which '
+                                 'has length {!r}'.format(pos, length))
+            i = min(bisect_right(self.offsets, pos) - 1, n_seg - 1)
+            x0, y0, scale, rot, ks = self._geometry[i]
+            table = self._tables[i]
+            # Position along the unscaled spiral, in [-0.5, 0.5].
+            t = 0.0 if scale == 0 else (pos - self.offsets[i]) / scale
+            j = min(int(t * _PIECES), _PIECES - 1)
+            ix, iy = _integrate(ks, -0.5 + j / _PIECES, t - 0.5)
+            ix += table[2 * j]
+            iy += table[2 * j + 1]
+            c, s = scale * cos(rot), scale * sin(rot)
+            u = t - 0.5
+            th = rot + _theta(ks, u)
+            result.x.append(x0 + c * ix - s * iy)
+            result.y.append(y0 + s * ix + c * iy)
+            result.dx.append(cos(th))
+            result.dy.append(sin(th))
+            dth = ks[0] + u * (ks[1] + u * (ks[2] / 2 + u * ks[3] / 6))
+            result.curvature.append(0.0 if scale == 0 else dth / scale)
+        return result
+
+
+def _theta(ks, u):
+    """Tangent angle of an unscaled spiral at u, in [-0.5, 0.5]."""
+    return u * (ks[0] + u * (ks[1] / 2 + u * (ks[2] / 6 + u * ks[3] / 24)))
+
+def _integrate(ks, u0, u1):
+    """Integrate the unit tangent of an unscaled spiral from u0 to u1."""
+    half, mid = (u1 - u0) / 2, (u1 + u0) / 2
+    ix = iy = 0.0
+    for node, weight in _GAUSS:
+        th = _theta(ks, mid + half * node)
+        ix += weight * cos(th)
+        iy += weight * sin(th)
+    return ix * half, iy * half
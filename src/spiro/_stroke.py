@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+"""Stroke outlines of Bézier curves."""
+
+# Copyright © 2015, 2016 Timothy Pederick.
+# Based on libspiro:
+#     Copyright © 2007 Raph Levien
+#
+# This file is part of PySpiro.
+#
+# PySpiro is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PySpiro is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ['StrokeContext']
+
+# Standard library imports.
+from math import atan2, ceil, copysign, cos, hypot, pi, sin, sqrt, tan
+
+# Local imports.
+from ._context import BezierContext
+from ._segments import SegmentArray, SegType, _cubic_point
+
+# Limit on how many times a curve is split while offsetting it.
+_MAX_DEPTH = 10
+# Pieces meeting at a smaller angle than this (in radians, roughly) are
+# treated as smooth, and not joined.
+_SMOOTH = 1e-4
+
+class StrokeContext(BezierContext):
+    """Generate the outline of a stroke along Bézier curves.
+
+    Use this class as a context manager. The outline is recorded in a
+    SegmentArray, available as the outline attribute once the context
+    has exited:
+        >>> with StrokeContext(10, join='round', cap='round') as ctx:
+        ...     spiro.tagged_to_bezier(points, ctx)
+        >>> ctx.outline.replay(svg_ctx)
+
+    Each closed subpath produces two closed contours, one on each side
+    and in opposite directions. Each open subpath produces one closed
+    contour around it, with caps at its ends. The outline is meant to
+    be filled with the nonzero winding rule.
+
+    The join style is one of 'miter', 'round' or 'bevel'; the cap style
+    is one of 'butt', 'round' or 'square'. Miters longer than
+    miter_limit times the width are bevelled instead, as in SVG. Curves
+    are offset to within the given tolerance, by default 1% of the
+    width. Knot indices marked by the native library are recorded with
+    the outline segments generated from each part of the curve.
+
+    """
+    joins = ('miter', 'round', 'bevel')
+    caps = ('butt', 'round', 'square')
+
+    def __init__(self, width, join='miter', cap='butt', miter_limit=4.0,
+                 tolerance=None):
+        if not width > 0:
+            raise ValueError('stroke width must be positive')
+        if join not in self.joins:
+            raise ValueError('unknown join style: {!r}'.format(join))
+        if cap not in self.caps:
+            raise ValueError('unknown cap style: {!r}'.format(cap))
+        self.half_width = width / 2
+        self.join = join
+        self.cap = cap
+        self.miter_limit = miter_limit
+        self.tolerance = width / 100 if tolerance is None else tolerance
+        self.outline = SegmentArray()
+        # Each piece is (segtype, coords, start tangent, end tangent, knot).
+        self._pieces = []
+        self._start = self._point = None
+        self._is_open = True
+        self._knot = -1
+
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context manager.
+
+        If an exception has resulted, the unfinished subpath is
+        discarded. Otherwise, its outline is generated.
+
+        """
+        if exc_type is None:
+            self.finish()
+        else:
+            self._pieces = []
+
+    def finish(self):
+        """Generate the outline of the current subpath, if any."""
+        if (not self._is_open and self._point is not None and
+                hypot(self._point[0] - self._start[0],
+                      self._point[1] - self._start[1]) > 1e-9):
+            self._add_piece(SegType.lineto, self._start)
+        pieces, self._pieces = self._pieces, []
+        if not pieces:
+            return
+        h = self.half_width
+        if self._is_open:
+            _, start, start_tan, _, start_knot = pieces[0]
+            _, end, _, end_tan, end_knot = pieces[-1]
+            contour = self._side(pieces, h, False)
+            contour.extend(self._cap(end[-2:], end_tan, end_knot))
+            contour.extend(_reverse(self._side(pieces, -h, False)))
+            contour.extend(self._cap(start[:2],
+                                     (-start_tan[0], -start_tan[1]),
+                                     start_knot))
+            self._emit(contour)
+        else:
+            self._emit(self._side(pieces, h, True))
+            self._emit(_reverse(self._side(pieces, -h, True)))
+
+    def moveto(self, ctx, x, y, is_open):
+        self.finish()
+        self._start = self._point = (x, y)
+        self._is_open = is_open
+
+    def lineto(self, ctx, x, y):
+        self._add_piece(SegType.lineto, (x, y))
+
+    def quadto(self, ctx, x1, y1, x2, y2):
+        self._add_piece(SegType.quadto, (x1, y1, x2, y2))
+
+    def curveto(self, ctx, x1, y1, x2, y2, x3, y3):
+        self._add_piece(SegType.curveto, (x1, y1, x2, y2, x3, y3))
+
+    def mark_knot(self, ctx, knot_idx):
+        self._knot = knot_idx
+
+    def _add_piece(self, segtype, coords):
+        """Add a segment to the subpath, skipping degenerate ones."""
+        if self._point is None:
+            raise ValueError('a subpath must begin with moveto()')
+        coords = self._point + coords
+        self._point = coords[-2:]
+        if segtype == SegType.quadto:
+            # Elevate to a cubic.
+            x0, y0, x1, y1, x2, y2 = coords
+            segtype = SegType.curveto
+            coords = (x0, y0, x0 + 2 * (x1 - x0) / 3, y0 + 2 * (y1 - y0) / 3,
+                      x2 + 2 * (x1 - x2) / 3, y2 + 2 * (y1 - y2) / 3, x2, y2)
+        start_tan = _tangent(coords)
+        if start_tan is not None:
+            end_tan = _tangent(_reverse_coords(coords))
+            self._pieces.append((segtype, coords, start_tan,
+                                 (-end_tan[0], -end_tan[1]), self._knot))
+
+    def _side(self, pieces, d, is_closed):
+        """Offset one side of a subpath, joining the pieces.
+
+        Positive distances are to the left of the direction of travel.
+        The result is a list of (segtype, coords, knot) tuples, where
+        coords includes each segment's starting point.
+
+        """
+        side = []
+        for i, (segtype, coords, start_tan, _, knot) in enumerate(pieces):
+            if i > 0 or is_closed:
+                # For closed subpaths, this joins the last piece to the
+                # first, so the side ends where it began.
+                prev_tan = pieces[i - 1][3]
+                side.extend(self._join(coords[:2], prev_tan, start_tan, d,
+                                       knot))
+            if segtype == SegType.lineto:
+                nx, ny = d * -start_tan[1], d * start_tan[0]
+                side.append((SegType.lineto,
+                             (coords[0] + nx, coords[1] + ny,
+                              coords[2] + nx, coords[3] + ny), knot))
+            else:
+                side.extend((SegType.curveto, offset, knot) for offset in
+                            _offset_cubic(coords, d, self.tolerance))
+        return side
+
+    def _join(self, point, tan_in, tan_out, d, knot):
+        """Join the offsets of two pieces meeting at a point."""
+        x, y = point
+        start = (x - d * tan_in[1], y + d * tan_in[0])
+        end = (x - d * tan_out[1], y + d * tan_out[0])
+        cross = tan_in[0] * tan_out[1] - tan_in[1] * tan_out[0]
+        dot = tan_in[0] * tan_out[0] + tan_in[1] * tan_out[1]
+        reversing = abs(cross) < _SMOOTH and dot < 0
+        if abs(cross) < _SMOOTH and dot > 0:
+            # Smooth: at most a small gap to close.
+            return _polyline((start, end), knot)
+        if cross * d > 0 and not reversing:
+            # The inner side of a corner. Passing through the point
+            # itself keeps the outline free of gaps.
+            return _polyline((start, point, end), knot)
+        if self.join == 'round':
+            # Go around the outside, or the front if the path reverses.
+            sweep = -copysign(pi, d) if reversing else atan2(cross, dot)
+            return _arc(point, start, sweep, knot)
+        if self.join == 'miter' and dot > -1:
+            miter_ratio = sqrt(2 / (1 + dot))
+            if miter_ratio <= self.miter_limit:
+                scale = d / (1 + dot)
+                miter = (x - scale * (tan_in[1] + tan_out[1]),
+                         y + scale * (tan_in[0] + tan_out[0]))
+                return _polyline((start, miter, end), knot)
+        return _polyline((start, end), knot)
+
+    def _cap(self, point, tan, knot):
+        """Cap the end of an open subpath, turning from left to right."""
+        x, y = point
+        h = self.half_width
+        nx, ny = -tan[1] * h, tan[0] * h
+        start, end = (x + nx, y + ny), (x - nx, y - ny)
+        if self.cap == 'round':
+            return _arc(point, start, -pi, knot)
+        if self.cap == 'square':
+            tx, ty = tan[0] * h, tan[1] * h
+            return _polyline((start, (start[0] + tx, start[1] + ty),
+                              (end[0] + tx, end[1] + ty), end), knot)
+        return _polyline((start, end), knot)
+
+    def _emit(self, contour):
+        """Add a closed contour to the outline."""
+        if not contour:
+            return
+        outline = self.outline
+        outline.mark_knot(None, contour[0][2])
+        outline.moveto(None, contour[0][1][0], contour[0][1][1], False)
+        for segtype, coords, knot in contour:
+            outline.mark_knot(None, knot)
+            if segtype == SegType.lineto:
+                outline.lineto(None, *coords[2:])
+            else:
+                outline.curveto(None, *coords[2:])
+        x0, y0 = contour[0][1][:2]
+        x1, y1 = contour[-1][1][-2:]
+        if hypot(x1 - x0, y1 - y0) > 1e-9:
+            outline.lineto(None, x0, y0)
+
+
+# Geometry helpers.
+def _tangent(coords):
+    """Find the unit tangent at the start of a segment, if it has one."""
+    x0, y0 = coords[:2]
+    for x, y in zip(coords[2::2], coords[3::2]):
+        length = hypot(x - x0, y - y0)
+        if length > 1e-12:
+            return (x - x0) / length, (y - y0) / length
+    return None
+
+def _reverse_coords(coords):
+    """Reverse the order of the points in a segment."""
+    return tuple(n for i in range(len(coords) - 2, -1, -2)
+                 for n in coords[i:i + 2])
+
+def _reverse(side):
+    """Reverse the direction of an offset side."""
+    return [(segtype, _reverse_coords(coords), knot)
+            for segtype, coords, knot in reversed(side)]
+
+def _polyline(points, knot):
+    """Join points with lines, skipping any of zero length."""
+    return [(SegType.lineto, p + q, knot) for p, q in zip(points, points[1:])
+            if hypot(q[0] - p[0], q[1] - p[1]) > 1e-9]
+
+def _arc(centre, start, sweep, knot):
+    """Approximate a circular arc with cubics of at most 90° each."""
+    cx, cy = centre
+    radius = hypot(start[0] - cx, start[1] - cy)
+    angle = atan2(start[1] - cy, start[0] - cx)
+    count = max(1, ceil(abs(sweep) / (pi / 2) - 1e-9))
+    step = sweep / count
+    k = 4 / 3 * tan(step / 4) * radius
+    segments = []
+    for i in range(count):
+        a0, a1 = angle + i * step, angle + (i + 1) * step
+        x0, y0 = cx + radius * cos(a0), cy + radius * sin(a0)
+        x3, y3 = cx + radius * cos(a1), cy + radius * sin(a1)
+        segments.append((SegType.curveto,
+                         (x0, y0, x0 - k * sin(a0), y0 + k * cos(a0),
+                          x3 + k * sin(a1), y3 - k * cos(a1), x3, y3), knot))
+    return segments
+
+def _split_cubic(coords):
+    """Split a cubic Bézier in half."""
+    x0, y0, x1, y1, x2, y2, x3, y3 = coords
+    x01, y01 = (x0 + x1) / 2, (y0 + y1) / 2
+    x12, y12 = (x1 + x2) / 2, (y1 + y2) / 2
+    x23, y23 = (x2 + x3) / 2, (y2 + y3) / 2
+    xa, ya = (x01 + x12) / 2, (y01 + y12) / 2
+    xb, yb = (x12 + x23) / 2, (y12 + y23) / 2
+    xm, ym = (xa + xb) / 2, (ya + yb) / 2
+    return ((x0, y0, x01, y01, xa, ya, xm, ym),
+            (xm, ym, xb, yb, x23, y23, x3, y3))
+
+def _offset_cubic(coords, d, tolerance, depth=0):
+    """Approximate the offset of a cubic Bézier by cubics."""
+    start_tan = _tangent(coords)
+    end_tan = _tangent(_reverse_coords(coords))
+    if start_tan is None:
+        return []
+    x0, y0, x1, y1, x2, y2, x3, y3 = coords
+    qx0, qy0 = x0 - d * start_tan[1], y0 + d * start_tan[0]
+    qx3, qy3 = x3 + d * end_tan[1], y3 - d * end_tan[0]
+    # Scale both handles so that the offset passes as near as possible to
+    # the exact offset point at t = 0.5, where a cubic is
+    # (q0 + q3) / 2 + 3/8 * (handle0 + handle3).
+    hx, hy = 3 / 8 * (x1 - x0 + x2 - x3), 3 / 8 * (y1 - y0 + y2 - y3)
+    mx, my = _exact_offset(coords, d, 0.5)
+    mx, my = mx - (qx0 + qx3) / 2, my - (qy0 + qy3) / 2
+    if hx * hx + hy * hy > 1e-12:
+        k0 = k3 = max(0.0, (mx * hx + my * hy) / (hx * hx + hy * hy))
+    else:
+        # The offset curve's speed is scaled by (1 - d * curvature).
+        k0 = _handle_scale(x0, y0, x1, y1, x2, y2, d)
+        k3 = _handle_scale(x3, y3, x2, y2, x1, y1, -d)
+    offset = (qx0, qy0, qx0 + k0 * (x1 - x0), qy0 + k0 * (y1 - y0),
+              qx3 + k3 * (x2 - x3), qy3 + k3 * (y2 - y3), qx3, qy3)
+    if depth < _MAX_DEPTH:
+        for t in (0.125, 0.25, 0.375, 0.5, 0.625, 0.75, 0.875):
+            ex, ey = _exact_offset(coords, d, t)
+            if hypot(ex - _cubic_point(*offset[0::2], t=t),
+                     ey - _cubic_point(*offset[1::2], t=t)) > tolerance:
+                first, second = _split_cubic(coords)
+                return (_offset_cubic(first, d, tolerance, depth + 1) +
+                        _offset_cubic(second, d, tolerance, depth + 1))
+    return [offset]
+
+def _handle_scale(x0, y0, x1, y1, x2, y2, d):
+    """Scale for the handle at the start of an offset cubic."""
+    dx, dy = x1 - x0, y1 - y0
+    speed = hypot(dx, dy)
+    if speed < 1e-12:
+        return 1.0
+    # Curvature at the start of the cubic, from its first and second
+    # derivatives, 3*(p1 - p0) and 6*(p2 - 2*p1 + p0).
+    ddx, ddy = x2 - 2 * x1 + x0, y2 - 2 * y1 + y0
+    curvature = 2 * (dx * ddy - dy * ddx) / (3 * speed ** 3)
+    return max(0.0, 1 - d * curvature)
+
+def _exact_offset(coords, d, t):
+    """Find the point at distance d to the left of a cubic at t."""
+    xs, ys = coords[0::2], coords[1::2]
+    mt = 1 - t
+    dx = 3 * (mt * mt * (xs[1] - xs[0]) + 2 * mt * t * (xs[2] - xs[1]) +
+              t * t * (xs[3] - xs[2]))
+    dy = 3 * (mt * mt * (ys[1] - ys[0]) + 2 * mt * t * (ys[2] - ys[1]) +
+              t * t * (ys[3] - ys[2]))
+    speed = hypot(dx, dy)
+    x, y = _cubic_point(*xs, t=t), _cubic_point(*ys, t=t)
+    if speed < 1e-12:
+        return x, y
+    return x - d * dy / speed, y + d * dx / speed
@@ -29,8 +29,12 @@ except ImportError:
     # Python pre-3.3
     from collections import Callable
 import ctypes
+import gzip
 import io
+import os
+import tempfile
 import unittest
+from xml.etree import ElementTree
 
 # Module to be tested.
 from spiro import _context
@@ -135,3 +139,157 @@ class TestSVGPathContext(unittest.TestCase):
             got_expected_error = True
         self.assertTrue(got_expected_error)
         self.assertEqual(self.buffer.getvalue(), 'M1,2 ')
+
+
+class TestTransformContext(unittest.TestCase):
+    """Test the TransformContext class."""
+    def setUp(self):
+        """Create a StringIO buffer to hold output."""
+        self.buffer = io.StringIO()
+
+    def tearDown(self):
+        """Close the StringIO buffer."""
+        self.buffer.close()
+
+    def test_transform(self):
+        """Check that every callback is transformed."""
+        # Scale by 2, skew horizontally, and translate by (10, -10).
+        matrix = (2, 0, 1, 2, 10, -10)
+        with _context.SVGPathContext(self.buffer) as svg:
+            ctx = _context.TransformContext(svg, matrix)
+            ctx.moveto(None, 0, 0, False)
+            ctx.lineto(None, 1, 1)
+            ctx.quadto(None, 2, 0, 0, 2)
+            ctx.curveto(None, 1, 0, 0, 1, -1, -1)
+            ctx.mark_knot(None, 3)
+        self.assertEqual(self.buffer.getvalue(),
+                         'M10,-10 L13,-8 Q14,-10 12,-6 C12,-10 11,-8 7,-12 Z')
+
+    def test_matrix_wrong(self):
+        """Check that invalid matrices are rejected."""
+        self.assertRaises(ValueError, _context.TransformContext, None,
+                          (1, 0, 0, 1))
+        self.assertRaises(TypeError, _context.TransformContext, None,
+                          (1, 0, 0, 1, 0, '0'))
+
+
+class TestSVGDocument(unittest.TestCase):
+    """Test the SVGDocument class."""
+    header = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<svg xmlns="http://www.w3.org/2000/svg" width="100" '
+              'height="50" viewBox="0 0 100 50.5">\n')
+
+    def setUp(self):
+        """Create a StringIO buffer to hold output."""
+        self.buffer = io.StringIO()
+
+    def tearDown(self):
+        """Close the StringIO buffer."""
+        self.buffer.close()
+
+    def draw(self, doc):
+        """Draw two paths in a document."""
+        with doc.path(fill='none', stroke_width=1.5) as ctx:
+            ctx.moveto(None, 0, 0, False)
+            ctx.lineto(None, 1.25, 2)
+        with doc.path({'class': 'a&b'}) as ctx:
+            ctx.moveto(None, 3, 4, True)
+            ctx.curveto(None, 1, 1, 2, 3, 5, 1 / 3)
+
+    expected = ('<path fill="none" stroke-width="1.5" d="M0,0 L1.25,2 Z"/>\n'
+                '<path class="a&amp;b" d="M3,4 C1,1 2,3 5,0.333 "/>\n'
+                '</svg>\n')
+
+    def test_paths(self):
+        """Check that each path gets its own element and closing."""
+        with _context.SVGDocument(self.buffer, 100, 50, precision=3,
+                                  view_box=(0, 0, 100, 50.5)) as doc:
+            self.draw(doc)
+        self.assertEqual(self.buffer.getvalue(), self.header + self.expected)
+        # A text stream passed in is left open.
+        self.assertFalse(self.buffer.closed)
+
+    def test_no_finishing(self):
+        """Check that an exception prevents further output."""
+        with self.assertRaises(TypeError):
+            with _context.SVGDocument(self.buffer) as doc:
+                with doc.path() as ctx:
+                    ctx.moveto(None, 1, 2, False)
+                    ctx.moveto() # raises TypeError
+        self.assertTrue(self.buffer.getvalue().endswith(
+            '<path d="M1,2 "/>\n'))
+
+    def test_handled_exception(self):
+        """Check that a handled exception leaves the output well-formed."""
+        with _context.SVGDocument(self.buffer) as doc:
+            for path_id in range(2):
+                try:
+                    with doc.path(id=path_id) as ctx:
+                        ctx.moveto(None, 0, 0, True)
+                        ctx.moveto() # raises TypeError
+                except TypeError:
+                    pass
+        root = ElementTree.fromstring(self.buffer.getvalue())
+        self.assertEqual([path.get('id') for path in root], ['0', '1'])
+        self.assertEqual([path.get('d') for path in root], ['M0,0 '] * 2)
+
+    def test_filename(self):
+        """Check that a file is only opened while the document is entered."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'doc.svg')
+            doc = _context.SVGDocument(filename, 100, 50, precision=3,
+                                       view_box=(0, 0, 100, 50.5))
+            self.assertFalse(os.path.exists(filename))
+            self.assertRaises(RuntimeError, doc.path)
+            with doc:
+                self.draw(doc)
+                self.assertRaises(RuntimeError, doc.__enter__)
+            self.assertIsNone(doc.file)
+            with open(filename, 'rt', encoding='utf-8') as f:
+                self.assertEqual(f.read(), self.header + self.expected)
+
+    def test_binary(self):
+        """Test writing to a binary stream."""
+        buffer = io.BytesIO()
+        with _context.SVGDocument(buffer, 100, 50, precision=3,
+                                  view_box=(0, 0, 100, 50.5)) as doc:
+            self.draw(doc)
+        self.assertFalse(buffer.closed)
+        self.assertEqual(buffer.getvalue().decode('utf-8'),
+                         self.header + self.expected)
+
+    def test_compressed(self):
+        """Test writing a gzip-compressed document."""
+        buffer = io.BytesIO()
+        with _context.SVGDocument(buffer, 100, 50, precision=3,
+                                  view_box=(0, 0, 100, 50.5),
+                                  compress=True) as doc:
+            self.draw(doc)
+        self.assertFalse(buffer.closed)
+        self.assertEqual(gzip.decompress(buffer.getvalue()).decode('utf-8'),
+                         self.header + self.expected)
+        self.assertRaises(ValueError, _context.SVGDocument, self.buffer,
+                          compress=True)
+
+    def test_path_not_entered(self):
+        """Check that nothing is written until a path is entered."""
+        with _context.SVGDocument(self.buffer) as doc:
+            doc.path(stroke='red')
+            self.assertNotIn('<path', self.buffer.getvalue())
+            # A path that was never entered is replaced by the next one.
+            with doc.path(fill='none') as ctx:
+                ctx.moveto(None, 0, 0, True)
+        self.assertTrue(self.buffer.getvalue().endswith(
+            '<path fill="none" d="M0,0 "/>\n</svg>\n'))
+
+    def test_nested_paths(self):
+        """Check that paths cannot be nested."""
+        with _context.SVGDocument(self.buffer) as doc:
+            with doc.path() as ctx:
+                ctx.moveto(None, 0, 0, True)
+                self.assertRaises(RuntimeError, doc.path)
+            with doc.path() as ctx:
+                ctx.moveto(None, 1, 1, True)
+        self.assertTrue(self.buffer.getvalue().endswith(
+            '<path d="M0,0 "/>\n<path d="M1,1 "/>\n</svg>\n'))
+        self.assertRaises(RuntimeError, doc._path.__enter__)
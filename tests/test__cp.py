@@ -24,10 +24,10 @@
 # Standard library imports.
 try:
     # Python 3.3+
-    from collections.abc import MutableSequence
+    from collections.abc import MutableSequence, Sequence
 except ImportError:
     # Python pre-3.3
-    from collections import MutableSequence
+    from collections import MutableSequence, Sequence
 import ctypes
 import unittest
 
@@ -63,6 +63,31 @@ class TestDataStructures(unittest.TestCase):
             self.assertIsNotNone(expected_type)
             self.assertIs(fieldtype, expected_type)
 
+    def test_spiro_seg_structure(self):
+        """Check the definition of the spiro_seg structure."""
+        self.assertTrue(issubclass(_cp.spiro_seg, ctypes.Structure))
+        fieldnames = [fieldname for fieldname, _ in _cp.spiro_seg._fields_]
+        self.assertEqual(fieldnames,
+                         ['x', 'y', 'ty', 'bend_th', 'ks', 'seg_ch', 'seg_th',
+                          'l'])
+        self.assertIs(dict(_cp.spiro_seg._fields_)['ty'], ctypes.c_char)
+        self.assertEqual(len(_cp.spiro_seg().ks), 4)
+
+
+class TestControlPointsAdaptation(unittest.TestCase):
+    """Test adaptation of sequences for native function calls."""
+    def test_from_sequence(self):
+        cps = _cp.ControlPoints.from_param([(1, 2, b'o'), (3, 4, b'c')])
+        self.assertEqual(len(cps), 2)
+        self.assertEqual((cps[1].x, cps[1].y, cps[1].ty), (3, 4, b'c'))
+
+    def test_from_native(self):
+        cps = _cp.ControlPoints.from_param([(1, 2, b'o')])
+        self.assertIs(_cp.ControlPoints.from_param(cps), cps)
+
+    def test_from_wrong(self):
+        self.assertRaises(TypeError, _cp.ControlPoints.from_param, 0)
+
 
 class TestControlPointsInstantiation(unittest.TestCase):
     """Test instantiation of the ControlPoints sequence type."""
@@ -140,3 +165,59 @@ class TestControlPointsSequence(unittest.TestCase):
                                self.cps.insert, 0, ('one', 2, b'o'))
         self.assertRaisesRegex(TypeError, 'coordinates must be real numeric',
                                self.cps.insert, 0, (1, 2j, b'o'))
+
+
+class TestPackedControlPoints(unittest.TestCase):
+    """Test the PackedControlPoints sequence type."""
+    def setUp(self):
+        self.cps = _cp.PackedControlPoints([(1, 2, b'{'), (3, 4, b'o')])
+
+    def test_is_sequence(self):
+        self.assertIsInstance(self.cps, Sequence)
+        self.assertFalse(hasattr(self.cps, '__dict__'))
+
+    def test_getitem(self):
+        self.assertEqual(len(self.cps), 2)
+        self.assertEqual(self.cps[0], (1, 2, b'{'))
+        self.assertEqual(self.cps[-1], (3, 4, b'o'))
+        self.assertEqual(self.cps[:1], [(1, 2, b'{')])
+        with self.assertRaises(IndexError):
+            self.cps[2]
+
+    def test_tag_markers(self):
+        self.cps.end_open(5, 6)
+        self.assertEqual(self.cps[2], (5, 6, b'}'))
+        self.cps.clear()
+        self.cps.add_point(7, 8)
+        self.cps.close()
+        self.assertEqual(list(self.cps), [(7, 8, b'o'), (0, 0, b'z')])
+
+    def test_append(self):
+        self.cps.append((5, 6, b'c'))
+        self.cps.extend([(7, 8, b'v')])
+        self.cps.add_point(9, 10)
+        self.assertEqual(self.cps[2:], [(5, 6, b'c'), (7, 8, b'v'),
+                                        (9, 10, b'o')])
+
+    def test_append_wrong(self):
+        self.assertRaisesRegex(ValueError, 'unknown control point type',
+                               self.cps.add_point, 1, 2, 'o')
+        self.assertRaisesRegex(TypeError, 'coordinates must be real numeric',
+                               self.cps.add_point, 'one', 2, b'o')
+        self.assertRaisesRegex(ValueError, 'unknown control point type',
+                               self.cps.append, (1, 2, 'o'))
+        self.assertRaises(ValueError, self.cps.append, (1, 2))
+        self.assertRaises(TypeError, self.cps.append, 1)
+        self.assertEqual(len(self.cps), 2)
+
+    def test_compact(self):
+        self.assertEqual(len(self.cps._buf), 2 * ctypes.sizeof(_cp.spiro_cp))
+
+    def test_from_param(self):
+        native = _cp.ControlPoints.from_param(self.cps)
+        self.assertEqual(len(native), 2)
+        self.assertEqual((native[1].x, native[1].y, native[1].ty),
+                         (3, 4, b'o'))
+        # The native array shares storage with the sequence.
+        native[1].x = 10
+        self.assertEqual(self.cps[1], (10, 4, b'o'))
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+"""Unit tests for the PySpiro _index module."""
+
+# Copyright © 2015, 2016 Timothy Pederick.
+# Based on libspiro:
+#     Copyright © 2007 Raph Levien
+#
+# This file is part of PySpiro.
+#
+# PySpiro is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PySpiro is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
+
+
+# Standard library imports.
+from math import floor
+import time
+import unittest
+
+# Module to be tested.
+from spiro import _index
+
+# Test cases.
+class TestSegmentIndex(unittest.TestCase):
+    """Test the SegmentIndex class."""
+    def setUp(self):
+        """Index two small paths."""
+        self.index = _index.SegmentIndex(cell_size=10)
+        with self.index.updating(0) as ctx:
+            ctx.moveto(None, 0, 0, True)
+            ctx.mark_knot(None, 0)
+            ctx.lineto(None, 30, 0)
+            ctx.mark_knot(None, 1)
+            ctx.curveto(None, 40, 0, 40, 20, 30, 20)
+        with self.index.updating(1) as ctx:
+            ctx.moveto(None, 100, 100, False)
+            ctx.mark_knot(None, 0)
+            ctx.lineto(None, 110, 100)
+
+    def test_invalid_cell_size(self):
+        """Check that a non-positive cell size is rejected."""
+        self.assertRaises(ValueError, _index.SegmentIndex, 0)
+
+    def test_contents(self):
+        """Check which paths are indexed."""
+        self.assertEqual(len(self.index), 2)
+        self.assertIn(0, self.index)
+        self.assertNotIn(2, self.index)
+
+    def test_query_rect(self):
+        """Test rectangle queries."""
+        self.assertEqual(self.index.query_rect(-5, -5, 5, 5), [(0, 0)])
+        self.assertEqual(self.index.query_rect(25, -5, 35, 5),
+                         [(0, 0), (0, 1)])
+        self.assertEqual(self.index.query_rect(200, 0, 35, 105),
+                         [(0, 1), (1, 0)])
+        self.assertEqual(self.index.query_rect(50, 50, 60, 60), [])
+
+    def test_nearest(self):
+        """Test nearest-segment queries."""
+        path_id, knot_idx, distance = self.index.nearest(15, 3)
+        self.assertEqual((path_id, knot_idx, distance), (0, 0, 3))
+        path_id, knot_idx, distance = self.index.nearest(40, 10)
+        self.assertEqual((path_id, knot_idx), (0, 1))
+        self.assertAlmostEqual(distance, 2.5, places=2)
+        path_id, knot_idx, distance = self.index.nearest(105, 150)
+        self.assertEqual((path_id, knot_idx, distance), (1, 0, 50))
+        self.assertIsNone(self.index.nearest(105, 150, max_distance=40))
+
+    def test_far_queries(self):
+        """Check that queries far from the data skip empty cells."""
+        index = _index.SegmentIndex(cell_size=10)
+        with index.updating(0) as ctx:
+            ctx.moveto(None, 0, 0, True)
+            ctx.mark_knot(None, 0)
+            ctx.lineto(None, 10, 0)
+        # Each of these would visit about 10**8 empty cells otherwise.
+        start = time.perf_counter()
+        self.assertEqual(index.query_rect(-50000, -50000, 50000, 50000),
+                         [(0, 0)])
+        self.assertEqual(index.query_rect(-50000, 5, 50000, 50000), [])
+        self.assertEqual(index.nearest(-60000, 0), (0, 0, 60000))
+        self.assertEqual(index.nearest(5, 60000)[:2], (0, 0))
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+    def test_long_segment(self):
+        """Check that segments only occupy the cells they pass through."""
+        index = _index.SegmentIndex()
+        with index.updating(0) as ctx:
+            ctx.moveto(None, 0, 0, True)
+            ctx.lineto(None, 50000, 50000)
+        # The bounding box covers 782 ** 2 cells, but the line crosses
+        # only the 782 on the diagonal and their neighbours.
+        self.assertLessEqual(len(index._grid), 4 * 782)
+        self.assertIn((500, 500), index._grid)
+        self.assertNotIn((0, 781), index._grid)
+        self.assertEqual(index.query_rect(32000, 32000, 32001, 32001),
+                         [(0, -1)])
+        self.assertEqual(index.query_rect(0, 49000, 1000, 50000), [])
+        self.assertAlmostEqual(index.nearest(0, 50000)[2], 50000 / 2 ** 0.5)
+
+    def test_curve_cells(self):
+        """Check that every cell a curve passes through is found."""
+        index = _index.SegmentIndex(cell_size=1)
+        cells = index._segment_cells((0, 0, 0, 40, 40, 40, 40, 0))
+        for i in range(1001):
+            t = i / 1000
+            x = 40 * (3 * (1 - t) * t * t + t * t * t)
+            y = 120 * (1 - t) * t
+            self.assertIn((floor(x), floor(y)), cells)
+        # Far fewer than the 1600 cells in the bounding box.
+        self.assertLess(len(cells), 500)
+
+    def test_mixed_path_ids(self):
+        """Check that path IDs need not be mutually orderable."""
+        with self.index.updating('a') as ctx:
+            ctx.moveto(None, 0, 5, True)
+            ctx.mark_knot(None, 0)
+            ctx.lineto(None, 10, 5)
+        self.assertEqual(self.index.query_rect(-5, -5, 5, 5),
+                         [(0, 0), ('a', 0)])
+        # Updating a path keeps its place in the order.
+        with self.index.updating(0) as ctx:
+            ctx.moveto(None, 0, 0, True)
+            ctx.mark_knot(None, 2)
+            ctx.lineto(None, 10, 0)
+        self.assertEqual(self.index.query_rect(-5, -5, 5, 5),
+                         [(0, 2), ('a', 0)])
+        self.index.remove(0)
+        self.assertEqual(self.index.query_rect(-5, -5, 5, 5), [('a', 0)])
+
+    def test_update(self):
+        """Check that updating a path replaces its segments."""
+        with self.index.updating(1) as ctx:
+            ctx.moveto(None, 0, 50, False)
+            ctx.mark_knot(None, 0)
+            ctx.lineto(None, 10, 50)
+        self.assertEqual(self.index.query_rect(90, 90, 120, 120), [])
+        self.assertEqual(self.index.query_rect(0, 45, 5, 55), [(1, 0)])
+
+    def test_failed_update(self):
+        """Check that an exception leaves the index unchanged."""
+        with self.assertRaises(TypeError):
+            with self.index.updating(1) as ctx:
+                ctx.moveto(None, 0, 50, False)
+                ctx.lineto() # raises TypeError
+        self.assertEqual(self.index.query_rect(90, 90, 120, 120), [(1, 0)])
+
+    def test_remove(self):
+        """Test removing paths."""
+        self.index.remove(0)
+        self.index.remove(0)
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.query_rect(-5, -5, 5, 5), [])
+        self.index.clear()
+        self.assertIsNone(self.index.nearest(0, 0))
@@ -56,3 +56,24 @@ class TestNativeFunctions(unittest.TestCase):
         self.assertIsInstance(_native.TaggedSpiroCPsToBezier, Callable)
         self.assertEqual(len(_native.TaggedSpiroCPsToBezier.argtypes), 2)
         self.assertIsNone(_native.TaggedSpiroCPsToBezier.restype)
+
+    def test_run_spiro_wrapper(self):
+        """Test the wrapper of the run_spiro() function."""
+        self.assertIs_FuncPtr(_native.run_spiro)
+        self.assertIsInstance(_native.run_spiro, Callable)
+        self.assertEqual(len(_native.run_spiro.argtypes), 2)
+        self.assertIsNotNone(_native.run_spiro.restype)
+
+    def test_free_spiro_wrapper(self):
+        """Test the wrapper of the free_spiro() function."""
+        self.assertIs_FuncPtr(_native.free_spiro)
+        self.assertIsInstance(_native.free_spiro, Callable)
+        self.assertEqual(len(_native.free_spiro.argtypes), 1)
+        self.assertIsNone(_native.free_spiro.restype)
+
+    def test_spiro_to_bpath_wrapper(self):
+        """Test the wrapper of the spiro_to_bpath() function."""
+        self.assertIs_FuncPtr(_native.spiro_to_bpath)
+        self.assertIsInstance(_native.spiro_to_bpath, Callable)
+        self.assertEqual(len(_native.spiro_to_bpath.argtypes), 3)
+        self.assertIsNone(_native.spiro_to_bpath.restype)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""Unit tests for the PySpiro _segments module."""
+
+# Copyright © 2015, 2016 Timothy Pederick.
+# Based on libspiro:
+#     Copyright © 2007 Raph Levien
+#
+# This file is part of PySpiro.
+#
+# PySpiro is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PySpiro is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
+
+
+# Standard library imports.
+import unittest
+
+# Module to be tested.
+from spiro import _segments
+
+# Test cases.
+class TestSegType(unittest.TestCase):
+    """Test the SegType enumeration."""
+    def test_SegType_enum(self):
+        """Check the definition of the SegType enumeration."""
+        self.assertEqual(len(_segments.SegType), 5)
+
+        self.assertEqual(_segments.SegType.moveto,      b'M')
+        self.assertEqual(_segments.SegType.moveto_open, b'{')
+        self.assertEqual(_segments.SegType.lineto,      b'L')
+        self.assertEqual(_segments.SegType.quadto,      b'Q')
+        self.assertEqual(_segments.SegType.curveto,     b'C')
+
+
+class TestSegmentArray(unittest.TestCase):
+    """Test the SegmentArray context."""
+    def setUp(self):
+        """Record a short path."""
+        self.segs = _segments.SegmentArray()
+        self.segs.moveto(None, 0, 0, True)
+        self.segs.mark_knot(None, 0)
+        self.segs.lineto(None, 10, 0)
+        self.segs.mark_knot(None, 1)
+        self.segs.quadto(None, 20, 0, 20, 10)
+        self.segs.curveto(None, 20, 20, 0, 20, 0, 10)
+
+    def test_length(self):
+        """Check that every callback records one segment."""
+        self.assertEqual(len(self.segs), 4)
+        self.assertEqual(len(self.segs.coords), 14)
+
+    def test_getitem(self):
+        """Check that segments include their starting points."""
+        self.assertEqual(self.segs[0], (b'{', (0, 0), -1))
+        self.assertEqual(self.segs[1], (b'L', (0, 0, 10, 0), 0))
+        self.assertEqual(self.segs[2], (b'Q', (10, 0, 20, 0, 20, 10), 1))
+        self.assertEqual(self.segs[-1],
+                         (b'C', (20, 10, 20, 20, 0, 20, 0, 10), 1))
+        self.assertEqual(len(self.segs[1:3]), 2)
+        with self.assertRaises(IndexError):
+            self.segs[4]
+
+    def test_no_starting_point(self):
+        """Check that a segment with no starting point is rejected."""
+        segs = _segments.SegmentArray()
+        segs.lineto(None, 1, 2)
+        self.assertRaisesRegex(ValueError, 'no starting point',
+                               segs.__getitem__, 0)
+
+    def test_bounds(self):
+        """Check tight bounding boxes of segments."""
+        self.assertEqual(self.segs.bounds(1), (0, 0, 10, 0))
+        self.assertEqual(self.segs.bounds(2), (10, 0, 20, 10))
+        self.assertEqual(self.segs.bounds(3), (0, 10, 20, 17.5))
+
+    def test_clear(self):
+        """Check that clearing discards everything."""
+        self.segs.clear()
+        self.assertEqual(len(self.segs), 0)
+        self.assertEqual(len(self.segs.coords), 0)
+
+    def test_copy(self):
+        """Check that copies are independent."""
+        other = self.segs.copy()
+        self.assertEqual(list(other), list(self.segs))
+        other.lineto(None, 1, 1)
+        self.assertEqual(len(self.segs), 4)
+
+    def test_transformed(self):
+        """Check that all coordinates are transformed."""
+        other = self.segs.transformed((0, 1, -1, 0, 5, 0))
+        self.assertEqual(other[0], (b'{', (5, 0), -1))
+        self.assertEqual(other[2], (b'Q', (5, 10, 5, 20, -5, 20), 1))
+        self.assertEqual(self.segs[0], (b'{', (0, 0), -1))
+
+    def test_replay(self):
+        """Check that replaying records the same segments."""
+        other = _segments.SegmentArray()
+        self.segs.replay(other)
+        self.assertEqual(list(other), list(self.segs))
+        other.clear()
+        self.segs.replay(other, (1, 0, 0, 1, 1, 1))
+        self.assertEqual(other[1], (b'L', (1, 1, 11, 1), 0))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""Unit tests for the PySpiro _solved module."""
+
+# Copyright © 2015, 2016 Timothy Pederick.
+# Based on libspiro:
+#     Copyright © 2007 Raph Levien
+#
+# This file is part of PySpiro.
+#
+# PySpiro is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PySpiro is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
+
+
+# Standard library imports.
+from math import hypot, pi
+import unittest
+
+# Module to be tested.
+from spiro import _solved
+from spiro import _cp
+from spiro import _segments
+
+# Test data.
+near_circle = [(-100, 0, b'o'), (0, 100, b'o'),
+               (100, 0, b'o'), (0, -100, b'o')]
+tagged_arc = [(-100, 0, b'{'), (0, 100, b'o'), (100, 0, b'}'), (0, 0, b'z')]
+
+# Test cases.
+class TestSolvedSpiro(unittest.TestCase):
+    """Test the SolvedSpiro class."""
+    def setUp(self):
+        """Solve the nearly-circular example."""
+        self.solved = _solved.SolvedSpiro(near_circle, True)
+
+    def test_empty(self):
+        """Check that an empty sequence is rejected."""
+        self.assertRaises(ValueError, _solved.SolvedSpiro, [], True)
+
+    def test_single_point(self):
+        """Check that a single point is rejected."""
+        self.assertRaises(ValueError, _solved.SolvedSpiro,
+                          [(0, 0, b'o')], False)
+        self.assertRaises(ValueError, _solved.SolvedSpiro.from_tagged,
+                          [(0, 0, b'}')])
+
+    def test_length(self):
+        """Check the length of the near-circle."""
+        self.assertEqual(len(self.solved.offsets), 5)
+        self.assertEqual(self.solved.offsets[0], 0)
+        self.assertAlmostEqual(self.solved.length, 200 * pi, delta=1)
+
+    def test_knots(self):
+        """Check that the curve passes through its points."""
+        samples = self.solved.sample(self.solved.offsets[:-1])
+        for (x, y, _), sx, sy in zip(near_circle, samples.x, samples.y):
+            self.assertAlmostEqual(x, sx, places=6)
+            self.assertAlmostEqual(y, sy, places=6)
+
+    def test_tangents(self):
+        """Check that tangents are unit vectors in the right direction."""
+        samples = self.solved.sample([0, self.solved.length / 8])
+        for dx, dy in zip(samples.dx, samples.dy):
+            self.assertAlmostEqual(hypot(dx, dy), 1)
+        # The near-circle is drawn clockwise from (-100, 0).
+        self.assertAlmostEqual(samples.dx[0], 0, places=6)
+        self.assertAlmostEqual(samples.dy[0], 1, places=6)
+        self.assertAlmostEqual(samples.x[1], -70.7107, delta=0.1)
+        self.assertAlmostEqual(samples.y[1], 70.7107, delta=0.1)
+
+    def test_curvature(self):
+        """Check that the near-circle's curvature is close to a circle's."""
+        samples = self.solved.sample([self.solved.length * i / 10
+                                      for i in range(10)])
+        for curvature in samples.curvature:
+            self.assertAlmostEqual(curvature, -0.01, delta=0.001)
+
+    def test_wrapping(self):
+        """Check that positions wrap around closed curves."""
+        length = self.solved.length
+        samples = self.solved.sample([10, length + 10, -length + 10])
+        self.assertEqual(samples.x[0], samples.x[1])
+        self.assertAlmostEqual(samples.x[0], samples.x[2])
+
+    def test_segments(self):
+        """Check that Bézier curves are generated and cached."""
+        segments = self.solved.segments
+        self.assertIs(self.solved.segments, segments)
+        self.assertEqual(segments[0], (b'M', (-100, 0), -1))
+        self.assertEqual(sorted(set(segments.knots)), [-1, 0, 1, 2, 3])
+
+    def test_to_bezier(self):
+        """Check that Bézier curves are replayed and transformed."""
+        segments = _segments.SegmentArray()
+        self.solved.to_bezier(segments)
+        self.assertEqual(list(segments), list(self.solved.segments))
+        segments.clear()
+        self.solved.to_bezier(segments, (0.5, 0, 0, 0.5, 0, 0))
+        self.assertEqual(segments[0], (b'M', (-50, 0), -1))
+
+    def test_tagged(self):
+        """Test solving a tagged, open curve."""
+        solved = _solved.SolvedSpiro.from_tagged(tagged_arc)
+        self.assertFalse(solved.is_closed)
+        self.assertEqual(len(solved.offsets), 3)
+        samples = solved.sample([solved.length])
+        self.assertAlmostEqual(samples.x[0], 100, places=6)
+        self.assertAlmostEqual(samples.y[0], 0, places=6)
+        self.assertRaises(ValueError, solved.sample, [solved.length + 1])
+
+    def test_tagged_native(self):
+        """Test solving a tagged curve from a native array."""
+        native = _cp.ControlPoints.from_param(tagged_arc)
+        solved = _solved.SolvedSpiro.from_tagged(native)
+        self.assertFalse(solved.is_closed)
+        self.assertEqual(list(solved.offsets),
+                         list(_solved.SolvedSpiro.from_tagged(
+                             tagged_arc).offsets))
+
+    def test_tagged_unterminated(self):
+        """Check that tagged points must be terminated."""
+        self.assertRaises(ValueError, _solved.SolvedSpiro.from_tagged,
+                          near_circle)
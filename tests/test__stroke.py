@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""Unit tests for the PySpiro _stroke module."""
+
+# Copyright © 2015, 2016 Timothy Pederick.
+# Based on libspiro:
+#     Copyright © 2007 Raph Levien
+#
+# This file is part of PySpiro.
+#
+# PySpiro is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PySpiro is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
+
+
+# Standard library imports.
+from math import hypot
+import unittest
+
+# Module to be tested.
+from spiro import _stroke
+from spiro._segments import _flatten
+
+# Test data.
+# The Bézier curves drawn for the nearly-circular example.
+near_circle_curves = [(-100, 26.1799, -89.2227, 52.1987, -70.7107, 70.7107),
+                      (-52.1987, 89.2227, -26.1799, 100, 0, 100),
+                      (26.1799, 100, 52.1987, 89.2227, 70.7107, 70.7107),
+                      (89.2227, 52.1987, 100, 26.1799, 100, 0),
+                      (100, -26.1799, 89.2227, -52.1987, 70.7107, -70.7107),
+                      (52.1987, -89.2227, 26.1799, -100, 0, -100),
+                      (-26.1799, -100, -52.1987, -89.2227, -70.7107, -70.7107),
+                      (-89.2227, -52.1987, -100, -26.1799, -100, 0)]
+
+# Test cases.
+class TestStrokeContext(unittest.TestCase):
+    """Test the StrokeContext class."""
+    def contours(self, outline):
+        """Split an outline into lists of points along each contour."""
+        contours = []
+        for segtype, coords, _ in outline:
+            if segtype == b'M':
+                contours.append([])
+            else:
+                contours[-1].extend(_flatten(segtype, coords))
+        return contours
+
+    def test_invalid(self):
+        """Check that invalid stroke parameters are rejected."""
+        self.assertRaises(ValueError, _stroke.StrokeContext, 0)
+        self.assertRaises(ValueError, _stroke.StrokeContext, 1, join='sharp')
+        self.assertRaises(ValueError, _stroke.StrokeContext, 1, cap='flat')
+
+    def test_no_moveto(self):
+        """Check that a subpath must be started first."""
+        ctx = _stroke.StrokeContext(1)
+        self.assertRaises(ValueError, ctx.lineto, None, 1, 1)
+
+    def test_closed_curve(self):
+        """Check the two contours of a stroked closed curve."""
+        with _stroke.StrokeContext(10) as ctx:
+            ctx.moveto(None, -100, 0, False)
+            for knot_idx, curve in enumerate(near_circle_curves):
+                ctx.mark_knot(None, knot_idx // 2)
+                ctx.curveto(None, *curve)
+        outer, inner = self.contours(ctx.outline)
+        for x, y in outer:
+            self.assertAlmostEqual(hypot(x, y), 105, delta=0.1)
+        for x, y in inner:
+            self.assertAlmostEqual(hypot(x, y), 95, delta=0.1)
+        # The contours run in opposite directions, starting at the left.
+        self.assertGreater(outer[1][1], outer[0][1])
+        self.assertLess(inner[1][1], inner[0][1])
+        self.assertEqual(set(ctx.outline.knots), {0, 1, 2, 3})
+
+    def test_open_butt(self):
+        """Check a stroked open polyline with butt caps."""
+        with _stroke.StrokeContext(2, join='bevel') as ctx:
+            ctx.moveto(None, 0, 0, True)
+            ctx.lineto(None, 10, 0)
+            ctx.lineto(None, 10, 10)
+        # The inner side of the corner passes through the corner itself.
+        self.assertEqual(self.contours(ctx.outline),
+                         [[(0, 1), (10, 1), (10, 1), (10, 0), (10, 0), (9, 0),
+                           (9, 0), (9, 10), (9, 10), (11, 10), (11, 10),
+                           (11, 0), (11, 0), (10, -1), (10, -1), (0, -1),
+                           (0, -1), (0, 1)]])
+
+    def test_miter(self):
+        """Check miter joins and the miter limit."""
+        with _stroke.StrokeContext(2, cap='square') as ctx:
+            ctx.moveto(None, 0, 0, True)
+            ctx.lineto(None, 10, 0)
+            ctx.lineto(None, 10, 10)
+        points = set(self.contours(ctx.outline)[0])
+        self.assertIn((11, -1), points)
+        self.assertIn((-1, 1), points)
+        self.assertIn((11, 11), points)
+        with _stroke.StrokeContext(2, miter_limit=1.2) as ctx:
+            ctx.moveto(None, 0, 0, True)
+            ctx.lineto(None, 10, 0)
+            ctx.lineto(None, 10, 10)
+        self.assertNotIn((11, -1), set(self.contours(ctx.outline)[0]))
+
+    def test_round(self):
+        """Check round joins and caps stay at the stroke's half-width."""
+        with _stroke.StrokeContext(4, join='round', cap='round') as ctx:
+            ctx.moveto(None, 0, 0, True)
+            ctx.lineto(None, 10, 0)
+            ctx.quadto(None, 20, 0, 20, 10)
+        contour, = self.contours(ctx.outline)
+        # Points beyond the ends must lie on the round caps.
+        for x, y in contour:
+            if x < 0:
+                self.assertAlmostEqual(hypot(x, y), 2, delta=0.01)
+            if y > 10:
+                self.assertAlmostEqual(hypot(x - 20, y - 10), 2, delta=0.01)
+
+    def test_closing_line(self):
+        """Check that closed subpaths are closed with a line if needed."""
+        with _stroke.StrokeContext(2) as ctx:
+            ctx.moveto(None, 0, 0, False)
+            ctx.lineto(None, 10, 0)
+            ctx.lineto(None, 10, 10)
+        # The path turns left, so its left side is inside.
+        inner, outer = self.contours(ctx.outline)
+        self.assertIn((round(-1 - 2 ** 0.5, 6), -1),
+                      [(round(x, 6), round(y, 6)) for x, y in outer])
+        self.assertIn((9, 0), inner)
+        self.assertEqual(inner[0], inner[-1])
+        self.assertEqual(outer[0], outer[-1])
+
+    def test_exception(self):
+        """Check that an exception discards the unfinished subpath."""
+        with self.assertRaises(TypeError):
+            with _stroke.StrokeContext(2) as ctx:
+                ctx.moveto(None, 0, 0, True)
+                ctx.lineto(None, 10, 0)
+                ctx.lineto() # raises TypeError
+        self.assertEqual(len(ctx.outline), 0)
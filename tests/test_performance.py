@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+"""Performance regression tests for PySpiro.
+
+These tests are skipped unless the PYSPIRO_PERF environment variable is
+set, since timings depend on the machine running them.
+
+Each workload's output is always checked against golden output stored
+in the perf_golden directory alongside this file, which is kept under
+version control. Each golden file holds the SVG path data generated by
+one workload, with one command or coordinate pair per line, so that a
+failure shows what changed. Golden output must be generated with
+libspiro, by running the tests with PYSPIRO_PERF_UPDATE_GOLDEN set;
+only commit changes to it when a change in output is intended. If a
+workload has no golden output, that check is skipped.
+
+Speed and memory use are compared against a local baseline instead (by
+default, the file perf_baseline.json alongside this one; set
+PYSPIRO_PERF_BASELINE to use another). A workload fails if its
+throughput falls by more than PYSPIRO_PERF_TIME_TOLERANCE (by default
+0.25, i.e. 25%), or if its peak memory use grows by more than
+PYSPIRO_PERF_MEMORY_TOLERANCE (also 0.25 by default). To record a new
+baseline for the machine running the tests, run them with
+PYSPIRO_PERF_UPDATE set.
+
+Peak memory is measured with tracemalloc, which only sees allocations
+made through Python's allocators. Memory allocated by libspiro itself,
+such as the solved segments and the solver's working matrices, is not
+counted.
+
+"""
+
+# Copyright © 2015, 2016 Timothy Pederick.
+# Based on libspiro:
+#     Copyright © 2007 Raph Levien
+#
+# This file is part of PySpiro.
+#
+# PySpiro is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PySpiro is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PySpiro. If not, see <http://www.gnu.org/licenses/>.
+
+# Standard library imports.
+import io
+import json
+from math import cos, pi, sin
+import os
+import time
+import tracemalloc
+import unittest
+
+# PySpiro imports.
+from spiro import (CPType, PackedControlPoints, SVGPathContext, to_bezier,
+                   tagged_to_bezier)
+
+# Test configuration.
+PERF_ENABLED = bool(os.environ.get('PYSPIRO_PERF'))
+PERF_UPDATE = bool(os.environ.get('PYSPIRO_PERF_UPDATE'))
+PERF_UPDATE_GOLDEN = bool(os.environ.get('PYSPIRO_PERF_UPDATE_GOLDEN'))
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), 'perf_golden')
+BASELINE_FILE = os.environ.get('PYSPIRO_PERF_BASELINE',
+                               os.path.join(os.path.dirname(__file__),
+                                            'perf_baseline.json'))
+TIME_TOLERANCE = float(os.environ.get('PYSPIRO_PERF_TIME_TOLERANCE', 0.25))
+MEMORY_TOLERANCE = float(os.environ.get('PYSPIRO_PERF_MEMORY_TOLERANCE', 0.25))
+# Each workload is timed this many times, and the fastest run is kept.
+REPEATS = 5
+
+# Test data.
+def dense_circle(n=512, radius=1000):
+    """A closed curve of many G4 points on a circle."""
+    return [(radius * cos(2 * pi * i / n), radius * sin(2 * pi * i / n),
+             CPType.g4) for i in range(n)]
+
+def long_wave(n=2000, step=10, amplitude=200):
+    """A long, open, tagged curve following a sine wave."""
+    types = [CPType.g2, CPType.g4, CPType.corner, CPType.g4]
+    points = [(i * step, amplitude * sin(i / 7), types[i % len(types)])
+              for i in range(n)]
+    points[0] = points[0][:2] + (CPType.open_contour,)
+    points[-1] = points[-1][:2] + (CPType.end_open_contour,)
+    return points
+
+def tiny_paths(n=2000):
+    """Many small closed curves."""
+    return [[(i, 0, CPType.g4), (i + 3, 2, CPType.g4),
+             (i + 1, 5, CPType.corner)] for i in range(n)]
+
+# Workloads. Each takes its test data and returns the SVG path data it
+# generates.
+def draw_dense_circle(points):
+    buffer = io.StringIO()
+    with SVGPathContext(buffer) as ctx:
+        to_bezier(points, True, ctx)
+    return buffer.getvalue()
+
+def draw_long_wave(points):
+    buffer = io.StringIO()
+    with SVGPathContext(buffer) as ctx:
+        tagged_to_bezier(points, ctx)
+    return buffer.getvalue()
+
+def draw_tiny_paths(paths):
+    buffer = io.StringIO()
+    for points in paths:
+        with SVGPathContext(buffer) as ctx:
+            to_bezier(points, True, ctx)
+        buffer.write('\n')
+    return buffer.getvalue()
+
+# Test cases.
+@unittest.skipUnless(PERF_ENABLED, 'set PYSPIRO_PERF to run performance tests')
+class TestPerformance(unittest.TestCase):
+    """Check the output, speed and memory use of PySpiro."""
+    @classmethod
+    def setUpClass(cls):
+        """Build the test data and load the stored baseline."""
+        cls.dense_circle = dense_circle()
+        cls.long_wave = long_wave()
+        cls.long_wave_packed = PackedControlPoints(cls.long_wave)
+        cls.tiny_paths = tiny_paths()
+
+        try:
+            with open(BASELINE_FILE, 'rt') as f:
+                cls.baseline = json.load(f)
+        except FileNotFoundError:
+            cls.baseline = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        """Store a new baseline, if requested."""
+        if PERF_UPDATE:
+            with open(BASELINE_FILE, 'wt') as f:
+                json.dump(cls.baseline, f, indent=2, sort_keys=True)
+                f.write('\n')
+
+    def check_output(self, name, output):
+        """Compare a workload's output against its golden output."""
+        filename = os.path.join(GOLDEN_DIR, name + '.txt')
+        commands = output.split()
+        if PERF_UPDATE_GOLDEN:
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            with open(filename, 'wt', encoding='utf-8') as f:
+                f.writelines(command + '\n' for command in commands)
+            return
+        try:
+            with open(filename, 'rt', encoding='utf-8') as f:
+                expected = f.read().split()
+        except FileNotFoundError:
+            self.skipTest('no golden output recorded for {!r}; run with '
+                          'PYSPIRO_PERF_UPDATE_GOLDEN set'.format(name))
+        self.assertEqual(commands, expected,
+                         msg='output of {!r} has changed'.format(name))
+
+    def measure(self, name, workload, data, n_points, golden=None):
+        """Run a workload and compare it against the stored results.
+
+        The output is compared against the golden output with the given
+        name, by default the same as the workload's.
+
+        """
+        output = workload(data)
+        with self.subTest(check='output'):
+            self.check_output(name if golden is None else golden, output)
+
+        best = float('inf')
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            workload(data)
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            workload(data)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result = {'throughput': n_points / best, 'peak_memory': peak}
+        if PERF_UPDATE:
+            self.baseline[name] = result
+            return
+        expected = self.baseline.get(name)
+        if expected is None:
+            self.skipTest('no baseline recorded for {!r}; run with '
+                          'PYSPIRO_PERF_UPDATE set'.format(name))
+
+        self.assertGreaterEqual(
+            result['throughput'],
+            expected['throughput'] * (1 - TIME_TOLERANCE),
+            msg='throughput of {!r} has regressed'.format(name))
+        self.assertLessEqual(
+            result['peak_memory'],
+            expected['peak_memory'] * (1 + MEMORY_TOLERANCE),
+            msg='peak memory use of {!r} has regressed'.format(name))
+
+    def test_dense_circle(self):
+        """Measure drawing a dense closed curve."""
+        self.measure('dense_circle', draw_dense_circle, self.dense_circle,
+                     len(self.dense_circle))
+
+    def test_long_wave(self):
+        """Measure drawing a long, open, tagged curve."""
+        self.measure('long_wave', draw_long_wave, self.long_wave,
+                     len(self.long_wave))
+
+    def test_long_wave_packed(self):
+        """Measure drawing a long, tagged curve from packed points."""
+        self.assertEqual(draw_long_wave(self.long_wave_packed),
+                         draw_long_wave(self.long_wave),
+                         msg='packed points gave different output')
+        self.measure('long_wave_packed', draw_long_wave,
+                     self.long_wave_packed, len(self.long_wave_packed),
+                     golden='long_wave')
+
+    def test_tiny_paths(self):
+        """Measure drawing many small closed curves."""
+        self.measure('tiny_paths', draw_tiny_paths, self.tiny_paths,
+                     sum(len(points) for points in self.tiny_paths))